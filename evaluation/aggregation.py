@@ -0,0 +1,208 @@
+"""Streaming aggregation of simulation results
+
+`GameAggregator` keeps only fixed-size running state (Welford mean/variance
+of completed lines, a line-count histogram, move counters, score sums,
+pattern and cache counters, and phase timings when profiling), so the analysis dicts of `BingoSimulator` can be
+produced for any number of games without retaining per-game results.
+Aggregators built in different workers are combined with `merge()`.
+"""
+
+from collections import Counter
+from statistics import NormalDist
+from typing import Dict
+
+import numpy as np
+
+from profiling import PhaseProfile
+from solver import KNOWN_PATTERNS
+
+SCORE_KEYS = ('three_line', 'four_line', 'five_line', 'total')
+CACHE_KEYS = ('hits', 'misses', 'evictions')
+MAX_LINES = 13
+
+
+class GameAggregator:
+    """Running statistics over played games"""
+
+    def __init__(self):
+        self.count = 0
+        # Welford state for completed lines
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min_lines = None
+        self.max_lines = None
+        self.line_counts = np.zeros(MAX_LINES + 1, dtype=np.int64)
+        self.move_counts = np.zeros(25, dtype=np.int64)
+        self.score_sums = np.zeros(len(SCORE_KEYS))
+        self.scored_moves = 0
+        self.player_moves = 0
+        self.pattern_counts = Counter()
+        self.cache_totals = np.zeros(len(CACHE_KEYS), dtype=np.int64)
+        self.profile = PhaseProfile()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _add_lines(self, count: int, mean: float, m2: float, min_lines: int, max_lines: int) -> None:
+        """Combine Welford state with another group's (Chan et al.'s parallel update)"""
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.min_lines = min_lines if self.min_lines is None else min(self.min_lines, min_lines)
+        self.max_lines = max_lines if self.max_lines is None else max(self.max_lines, max_lines)
+
+    def update(self, result) -> None:
+        """Add one GameResult"""
+        self._add_lines(1, float(result.completed_lines), 0.0, result.completed_lines, result.completed_lines)
+        self.line_counts[result.completed_lines] += 1
+        self.move_counts += np.bincount(result.moves, minlength=25)
+        # Only player moves are scored
+        player_scores = result.scores[::2]
+        self.score_sums += [sum(score[key] for score in player_scores) for key in SCORE_KEYS]
+        self.scored_moves += len(player_scores)
+        self.player_moves += len(result.moves) // 2
+        self.pattern_counts.update(match['description'] for match in result.pattern_matches)
+        self.cache_totals += [result.cache_stats.get(key, 0) for key in CACHE_KEYS]
+
+    def update_arrays(self, arrays: Dict[str, np.ndarray]) -> None:
+        """Add a chunk of games in the packed layout of `simulator.pack_results`"""
+        completed_lines = arrays['completed_lines'].astype(np.int64)
+        if len(completed_lines) == 0:
+            return
+        mean = float(completed_lines.mean())
+        self._add_lines(len(completed_lines), mean, float(((completed_lines - mean) ** 2).sum()),
+                        int(completed_lines.min()), int(completed_lines.max()))
+        self.line_counts += np.bincount(completed_lines, minlength=MAX_LINES + 1)
+        self.move_counts += np.bincount(arrays['moves'].ravel(), minlength=25)
+        scores = arrays['scores'].reshape(-1, len(SCORE_KEYS))
+        self.score_sums += scores.sum(axis=0, dtype=np.float64)
+        self.scored_moves += len(scores)
+        pattern_indices = arrays['pattern_indices']
+        self.player_moves += pattern_indices.size
+        self.pattern_counts.update(
+            KNOWN_PATTERNS[index]['description'] for index in pattern_indices[pattern_indices >= 0].tolist()
+        )
+        if 'cache_stats' in arrays:
+            self.cache_totals += arrays['cache_stats'].sum(axis=0, dtype=np.int64)
+
+    def merge(self, other: 'GameAggregator') -> 'GameAggregator':
+        """Fold another aggregator into this one (e.g. one returned by a worker)"""
+        if other.count:
+            self._add_lines(other.count, other.mean, other.m2, other.min_lines, other.max_lines)
+        self.line_counts += other.line_counts
+        self.move_counts += other.move_counts
+        self.score_sums += other.score_sums
+        self.scored_moves += other.scored_moves
+        self.player_moves += other.player_moves
+        self.pattern_counts.update(other.pattern_counts)
+        self.cache_totals += other.cache_totals
+        self.profile.merge(other.profile)
+        return self
+
+    def mean_half_width(self, confidence: float = 0.95) -> float:
+        """Half-width of the normal confidence interval on mean completed lines"""
+        if self.count < 2:
+            return float('inf')
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        return float(z * np.sqrt(self.m2 / (self.count - 1) / self.count))
+
+    def distribution_half_widths(self, confidence: float = 0.95) -> Dict[str, float]:
+        """Wilson score interval half-width of each line_distribution bucket's probability"""
+        if self.count == 0:
+            return {str(i): float('inf') for i in range(MAX_LINES + 1)}
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        n = self.count
+        p = self.line_counts / n
+        half_widths = z / (1 + z * z / n) * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n))
+        return {str(i): float(half_widths[i]) for i in range(MAX_LINES + 1)}
+
+    def to_dict(self) -> Dict:
+        """JSON-serializable state (floats round-trip exactly)"""
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'm2': self.m2,
+            'min_lines': self.min_lines,
+            'max_lines': self.max_lines,
+            'line_counts': self.line_counts.tolist(),
+            'move_counts': self.move_counts.tolist(),
+            'score_sums': self.score_sums.tolist(),
+            'scored_moves': self.scored_moves,
+            'player_moves': self.player_moves,
+            'pattern_counts': dict(self.pattern_counts),
+            'cache_totals': self.cache_totals.tolist(),
+            'profile': self.profile.to_dict()
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> 'GameAggregator':
+        aggregator = cls()
+        aggregator.count = state['count']
+        aggregator.mean = state['mean']
+        aggregator.m2 = state['m2']
+        aggregator.min_lines = state['min_lines']
+        aggregator.max_lines = state['max_lines']
+        aggregator.line_counts = np.array(state['line_counts'], dtype=np.int64)
+        aggregator.move_counts = np.array(state['move_counts'], dtype=np.int64)
+        aggregator.score_sums = np.array(state['score_sums'], dtype=np.float64)
+        aggregator.scored_moves = state['scored_moves']
+        aggregator.player_moves = state['player_moves']
+        aggregator.pattern_counts = Counter(state['pattern_counts'])
+        aggregator.cache_totals = np.array(state['cache_totals'], dtype=np.int64)
+        if 'profile' in state:
+            aggregator.profile = PhaseProfile.from_dict(state['profile'])
+        return aggregator
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> 'GameAggregator':
+        aggregator = cls()
+        if arrays:
+            aggregator.update_arrays(arrays)
+        return aggregator
+
+    def get_statistics(self) -> Dict:
+        """Same dict as BingoSimulator.get_statistics()"""
+        return {
+            'mean_lines': self.mean,
+            'std_lines': float(np.sqrt(self.m2 / self.count)) if self.count else 0.0,
+            'min_lines': self.min_lines,
+            'max_lines': self.max_lines,
+            'line_distribution': {
+                str(i): int(self.line_counts[i])
+                for i in range(MAX_LINES + 1)
+            },
+            'total_games': self.count
+        }
+
+    def analyze_move_patterns(self) -> Dict:
+        return {str(i): float(self.move_counts[i] / self.count) for i in range(25)}
+
+    def analyze_score_patterns(self) -> Dict:
+        means = self.score_sums / self.scored_moves
+        return {f'mean_{key}': float(mean) for key, mean in zip(SCORE_KEYS, means)}
+
+    def analyze_pattern_recognition(self) -> Dict:
+        total_matches = sum(self.pattern_counts.values())
+        match_rate = (total_matches / self.player_moves) * 100 if self.player_moves > 0 else 0
+        most_common = self.pattern_counts.most_common(1)[0] if self.pattern_counts else ("None", 0)
+        return {
+            'total_matches': total_matches,
+            'match_rate': match_rate,
+            'most_common_pattern': {
+                'description': most_common[0],
+                'count': most_common[1]
+            },
+            'pattern_counts': dict(self.pattern_counts)
+        }
+
+    def analyze_cache(self) -> Dict:
+        totals = dict(zip(CACHE_KEYS, self.cache_totals.tolist()))
+        lookups = totals['hits'] + totals['misses']
+        return {
+            'hits': totals['hits'],
+            'misses': totals['misses'],
+            'evictions': totals['evictions'],
+            'hit_rate': (totals['hits'] / lookups) * 100 if lookups > 0 else 0
+        }
@@ -0,0 +1,430 @@
+"""Benchmarks for the Bingo solver engines"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import time
+from datetime import datetime, timezone
+from functools import partial
+from multiprocessing import Pool
+from pathlib import Path
+from itertools import combinations
+from typing import Callable, Dict, List, Optional, Sequence, Set
+
+from opening_book import config_hash
+from scoring_config import GAME_CONSTRAINTS, LINE_SCORES, NEW_SCORING
+from simulator import BatchedSimulator, BingoSimulator, run_game
+from solver import (BingoSolver, ENGINES, KNOWN_PATTERNS, TIERS, SolverTables, _line_combinations, build_tables,
+                    canonical_form, get_tables, transform_mask)
+
+
+def random_boards(size: int, count: int, seed: int = 0, board_size: int = 25) -> List[Set[int]]:
+    """Generate `count` random board states with `size` selected cells"""
+    rng = random.Random(seed * 100 + size)
+    return [set(rng.sample(range(board_size), size)) for _ in range(count)]
+
+
+def time_evaluate_move(engine: str, boards: List[Set[int]], config: Optional[Dict] = None) -> float:
+    """Average seconds per evaluated move over every free cell of each board
+
+    The vectorized engine scores all moves in one evaluate_all_moves() call,
+    so its cost is amortized over the free cells. The incremental engine's
+    counters are built before timing, as they are maintained across a game.
+    """
+    calls = 0
+    elapsed = 0.0
+    for board in boards:
+        solver = BingoSolver(board, engine=engine, config=config)
+        if engine == 'incremental':
+            solver.ensure_counters()
+        moves = solver.get_possible_moves()
+        start = time.perf_counter()
+        if engine == 'vectorized':
+            solver.evaluate_all_moves()
+        else:
+            for move in moves:
+                solver.evaluate_move(move)
+        elapsed += time.perf_counter() - start
+        calls += len(moves)
+    return elapsed / calls
+
+
+def benchmark_engines(samples: int = 5, seed: int = 0) -> Dict[int, Dict[str, float]]:
+    """Per-move latency (seconds) of each engine for board sizes 0-16"""
+    build_tables()
+    results = {}
+    for size in range(17):
+        boards = random_boards(size, samples, seed)
+        results[size] = {engine: time_evaluate_move(engine, boards) for engine in ENGINES}
+    return results
+
+
+def benchmark_exact_distribution(num_games: int = 5000, num_workers: int = 4, engine: str = 'vectorized') -> Dict:
+    """Wall time and statistics of a sampled run versus the exact distribution"""
+    simulator = BingoSimulator(num_games=num_games, engine=engine)
+
+    start = time.perf_counter()
+    simulator.run_simulation(num_workers=num_workers)
+    sampled_time = time.perf_counter() - start
+    sampled = simulator.get_statistics()
+
+    start = time.perf_counter()
+    exact = simulator.compute_exact_distribution(engine=engine)
+    exact_time = time.perf_counter() - start
+
+    return {'sampled': sampled, 'sampled_seconds': sampled_time, 'exact': exact, 'exact_seconds': exact_time}
+
+
+def benchmark_batched(num_games: int = 5000, num_workers: int = 4, engines=('set', 'vectorized')) -> Dict[str, float]:
+    """Games per second of the Pool-based simulator (per engine) and the batched simulator"""
+    results = {}
+    for engine in engines:
+        simulator = BingoSimulator(num_games=num_games, engine=engine)
+        start = time.perf_counter()
+        simulator.run_simulation(num_workers=num_workers)
+        results[f'pool ({engine})'] = num_games / (time.perf_counter() - start)
+
+    simulator = BatchedSimulator(num_games=num_games, seed=0)
+    start = time.perf_counter()
+    simulator.run_simulation()
+    results['batched'] = num_games / (time.perf_counter() - start)
+    return results
+
+
+def _run_per_game(num_games: int, num_workers: int, engine: str) -> None:
+    """The pre-chunking simulation loop: one task and one pickled GameResult per game"""
+    with Pool(num_workers) as pool:
+        list(pool.imap(partial(run_game, engine=engine), range(num_games)))
+
+
+def benchmark_scaling(num_games: int = 2000, workers: Sequence[int] = (1, 2, 4, 8, 16),
+                      chunk_size: int = 100, engine: str = 'vectorized') -> Dict[int, Dict[str, float]]:
+    """Games per second and scaling efficiency of per-game and chunked multiprocessing
+
+    Efficiency is throughput relative to `workers` times the same path's
+    single-worker throughput.
+    """
+    results = {}
+    for num_workers in workers:
+        start = time.perf_counter()
+        _run_per_game(num_games, num_workers, engine)
+        per_game = num_games / (time.perf_counter() - start)
+
+        simulator = BingoSimulator(num_games=num_games, engine=engine, seed=0)
+        start = time.perf_counter()
+        simulator.run_simulation(num_workers=num_workers, chunk_size=chunk_size)
+        chunked = num_games / (time.perf_counter() - start)
+        results[num_workers] = {'per_game': per_game, 'chunked': chunked}
+
+    base = results[workers[0]]
+    for num_workers, timings in results.items():
+        scale = num_workers / workers[0]
+        timings['per_game_efficiency'] = timings['per_game'] / (base['per_game'] * scale)
+        timings['chunked_efficiency'] = timings['chunked'] / (base['chunked'] * scale)
+    return results
+
+
+def board_size_config(size: int) -> Dict[str, Dict]:
+    """Scoring config for a `size` x `size` board
+
+    The cell budget (max_cells, which is also the power exponent) and the
+    new-scoring threshold scale with the board area from their 5x5 values.
+    """
+    board_size = size * size
+    max_cells = round(board_size * GAME_CONSTRAINTS['max_cells'] / GAME_CONSTRAINTS['board_size'])
+    threshold = round(board_size * NEW_SCORING['threshold'] / GAME_CONSTRAINTS['board_size'])
+    return {
+        'line_scores': {tier: dict(scores, power_exponent=max_cells) for tier, scores in LINE_SCORES.items()},
+        'new_scoring': dict(NEW_SCORING, threshold=threshold),
+        'game_constraints': dict(GAME_CONSTRAINTS, board_size=board_size, max_cells=max_cells,
+                                 max_cells_for_line=size)
+    }
+
+
+def _line_combinations_exhaustive(lines: List[List[int]], size: int, max_cells: int) -> List[List[List[int]]]:
+    """Reference enumeration: filter every `size`-line subset by the size of its union"""
+    line_grids = [set(line) for line in lines]
+    return [
+        [lines[i] for i in indices] for indices in combinations(range(len(lines)), size)
+        if len(set().union(*(line_grids[i] for i in indices))) <= max_cells
+    ]
+
+
+def benchmark_board_sizes(sizes: Sequence[int] = range(5, 10), samples: int = 3, seed: int = 0,
+                          engines: Sequence[str] = ENGINES) -> Dict[int, Dict]:
+    """Table build time, combination enumeration and per-move latency on N x N boards
+
+    Per board size (see board_size_config): seconds to build SolverTables
+    cold, seconds to enumerate the 3/4/5-line combinations exhaustively and
+    with the pruned search of _line_combinations, the combination counts,
+    and each engine's seconds per evaluated move on boards filled to half
+    the new-scoring threshold (original scoring).
+    """
+    results = {}
+    for size in sizes:
+        config = board_size_config(size)
+        game_constraints = config['game_constraints']
+        max_cells = game_constraints['max_cells']
+        start = time.perf_counter()
+        tables = SolverTables(config['line_scores'], game_constraints)
+        build = time.perf_counter() - start
+        lines = list(tables.line_definitions.values())
+        tiers = (3, 4, 5)
+        exhaustive = _best_time(lambda: [_line_combinations_exhaustive(lines, tier, max_cells) for tier in tiers], 1)
+        pruned = _best_time(lambda: [_line_combinations(lines, tier, max_cells) for tier in tiers], 1)
+
+        get_tables(config['line_scores'], game_constraints)
+        boards = random_boards(config['new_scoring']['threshold'] // 2, samples, seed, game_constraints['board_size'])
+        results[size] = {
+            'max_cells': max_cells,
+            'combinations': sum(len(tables.combination_masks[tier]) for tier in TIERS),
+            'tables_build': build,
+            'enumerate_exhaustive': exhaustive,
+            'enumerate_pruned': pruned,
+            'evaluate_move': {engine: time_evaluate_move(engine, boards, config) for engine in engines}
+        }
+    return results
+
+
+def _canonical_form_lambdas(board_state: Set[int], transformations: List[Callable[[int], int]]) -> int:
+    """Canonical mask computed cell by cell through the transformation lambdas"""
+    return min(sum(1 << transform(cell) for cell in board_state) for transform in transformations)
+
+
+def _check_patterns_lambdas(board_state: Set[int], patterns: List[Dict], transformations: List[Callable[[int], int]]):
+    """Lambda-based pattern matching: transform, sort and compare each pattern per transformation"""
+    current_cells = sorted(board_state)
+    for pattern in patterns:
+        if len(pattern['cells']) != len(current_cells):
+            continue
+        for transform in transformations:
+            if sorted(transform(cell) for cell in pattern['cells']) == current_cells:
+                return transform(pattern['optimal_move'])
+    return None
+
+
+def benchmark_transformations(count: int = 2000, seed: int = 0) -> Dict[str, Dict[str, float]]:
+    """Seconds per board of the lambda-based and lookup-table symmetry primitives"""
+    tables = get_tables()
+    transformations = tables.transformations
+    boards = [board for size in range(17) for board in random_boards(size, count // 17 + 1, seed)]
+    masks = [sum(1 << cell for cell in board) for board in boards]
+    pattern = KNOWN_PATTERNS[0]
+    pattern_board = {transformations[3](cell) for cell in pattern['cells']}
+    solver = BingoSolver(set(pattern_board))
+
+    def per_board(func: Callable[[], object], items: List) -> float:
+        return _best_time(func, 1) / len(items)
+
+    return {
+        'transform (all 8)': {
+            'lambdas': per_board(lambda: [[sum(1 << t(cell) for cell in board) for t in transformations]
+                                          for board in boards], boards),
+            'tables': per_board(lambda: [[transform_mask(mask, index, tables) for index in range(8)]
+                                         for mask in masks], masks)
+        },
+        'canonical_form': {
+            'lambdas': per_board(lambda: [_canonical_form_lambdas(board, transformations) for board in boards], boards),
+            'tables': per_board(lambda: [canonical_form(mask, tables) for mask in masks], masks)
+        },
+        'check_patterns': {
+            'lambdas': _best_time(lambda: _check_patterns_lambdas(pattern_board, KNOWN_PATTERNS, transformations), 1000),
+            'tables': _best_time(solver._check_patterns, 1000)
+        }
+    }
+
+
+def _best_time(func: Callable[[], object], number: int, repeat: int = 3) -> float:
+    """Seconds per call of `func`, best of `repeat` runs of `number` calls"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def _regime(size: int) -> str:
+    """Scoring regime of a move played on a board with `size` selected cells"""
+    return 'new' if size + 1 > NEW_SCORING['threshold'] else 'original'
+
+
+def run_suite(samples: int = 5, games: int = 20, workers: Sequence[int] = (1, 2, 4), seed: int = 0,
+              engines: Sequence[str] = ENGINES) -> Dict[str, float]:
+    """Micro and macro benchmarks, as a flat mapping of benchmark name to seconds per operation
+
+    Micro benchmarks cover solver construction (with the process-wide tables
+    warm, and building the tables cold), the combination properties (warm
+    lookups and cold enumeration), evaluate_move and get_optimal_move at every
+    board size 0-16 (each name records the scoring regime of the move),
+    and _check_patterns. Macro benchmarks time run_game and
+    BingoSimulator.run_simulation (seconds per game) for each worker count.
+    """
+    build_tables()
+    results = {}
+    lines = list(BingoSolver(set()).line_definitions.values())
+
+    results['tables_build'] = _best_time(lambda: SolverTables(LINE_SCORES, GAME_CONSTRAINTS), 1)
+    results['solver_init'] = _best_time(lambda: BingoSolver(set()), 1000)
+    masks = [sum(1 << cell for cell in board) for size in range(17) for board in random_boards(size, samples, seed)]
+    results['canonical_form'] = _best_time(lambda: [canonical_form(mask) for mask in masks], 10) / len(masks)
+    solver = BingoSolver(set())
+    for size, tier in ((3, 'three'), (4, 'four'), (5, 'five')):
+        prop = f'{tier}_line_combinations'
+        results[prop] = _best_time(lambda: getattr(solver, prop), 10000)
+        results[f'{prop}_build'] = _best_time(lambda: _line_combinations(lines, size, GAME_CONSTRAINTS['max_cells']), 3)
+
+    for size in range(17):
+        boards = random_boards(size, samples, seed)
+        regime = _regime(size)
+        for engine in engines:
+            results[f'evaluate_move[{engine},cells={size},{regime}]'] = min(
+                time_evaluate_move(engine, boards) for _ in range(3)
+            )
+            if size < GAME_CONSTRAINTS['max_cells']:
+                results[f'get_optimal_move[{engine},cells={size},{regime}]'] = sum(
+                    _best_time(BingoSolver(set(board), engine=engine).get_optimal_move, 1) for board in boards
+                ) / len(boards)
+
+    for pattern in KNOWN_PATTERNS:
+        size = len(pattern['cells'])
+        hit = BingoSolver(set(pattern['cells']))
+        miss = BingoSolver(random_boards(size, 1, seed)[0])
+        results[f'check_patterns[hit,cells={size}]'] = _best_time(hit._check_patterns, 1000)
+        results[f'check_patterns[miss,cells={size}]'] = _best_time(miss._check_patterns, 1000)
+
+    for engine in engines:
+        start = time.perf_counter()
+        for game_index in range(games):
+            random.seed(seed * games + game_index)
+            run_game(game_index, engine=engine)
+        results[f'run_game[{engine}]'] = (time.perf_counter() - start) / games
+
+    for num_workers in workers:
+        simulator = BingoSimulator(num_games=games * num_workers, engine='vectorized', seed=seed)
+        start = time.perf_counter()
+        simulator.run_simulation(num_workers=num_workers, chunk_size=max(1, games // 4))
+        results[f'run_simulation[workers={num_workers}]'] = (time.perf_counter() - start) / simulator.num_games
+    return results
+
+
+def write_suite_results(results: Dict[str, float], path: str) -> None:
+    """Write suite results as JSON together with where and against which config they were measured"""
+    report = {
+        'metadata': {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'config_hash': config_hash()
+        },
+        'results': results
+    }
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+def compare_suite_results(baseline_path: str, results: Dict[str, float],
+                          tolerance: float = 0.2) -> Dict[str, Dict[str, float]]:
+    """Benchmarks at least `tolerance` (relative) slower than in the baseline JSON file"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)['results']
+    regressions = {}
+    for name, seconds in results.items():
+        if name in baseline and baseline[name] > 0 and seconds > baseline[name] * (1 + tolerance):
+            regressions[name] = {'baseline': baseline[name], 'current': seconds, 'ratio': seconds / baseline[name]}
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solver benchmarks")
+    parser.add_argument('--exact-distribution', action='store_true',
+                        help="Compare a sampled simulation with compute_exact_distribution()")
+    parser.add_argument('--batched', action='store_true',
+                        help="Compare games/second of the Pool-based and batched simulators")
+    parser.add_argument('--scaling', action='store_true',
+                        help="Compare per-game and chunked multiprocessing over 1/2/4/8/16 workers")
+    parser.add_argument('--suite', action='store_true',
+                        help="Run the micro/macro benchmark suite and write the timings as JSON")
+    parser.add_argument('--output', default='results/benchmark.json', help="JSON file for --suite")
+    parser.add_argument('--suite-games', type=int, default=20,
+                        help="Games per engine for run_game, and per worker for run_simulation, in --suite")
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help="With --suite, flag benchmarks slower than in this earlier --suite JSON file")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="Relative slowdown flagged as a regression by --compare")
+    parser.add_argument('--transformations', action='store_true',
+                        help="Compare lambda-based and lookup-table board transformations")
+    parser.add_argument('--board-sizes', action='store_true',
+                        help="Time table builds and per-move latency on 5x5 through 9x9 boards")
+    parser.add_argument('--games', type=int, default=5000)
+    parser.add_argument('--chunk-size', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    if args.suite:
+        results = run_suite(games=args.suite_games, workers=sorted({1, 2, args.workers}))
+        write_suite_results(results, args.output)
+        for name, seconds in results.items():
+            print(f"{name:>48}: {seconds * 1e6:>12.1f} us")
+        print(f"Wrote {len(results)} timings to {args.output}")
+        if args.compare:
+            regressions = compare_suite_results(args.compare, results, args.tolerance)
+            for name, regression in regressions.items():
+                print(f"REGRESSION {name}: {regression['baseline'] * 1e6:.1f} -> "
+                      f"{regression['current'] * 1e6:.1f} us ({regression['ratio']:.2f}x)")
+            if regressions:
+                raise SystemExit(1)
+        return
+
+    if args.transformations:
+        print(f"{'':>18} {'lambdas (us)':>13} {'tables (us)':>12} {'speedup':>8}")
+        for name, timings in benchmark_transformations().items():
+            print(f"{name:>18} {timings['lambdas'] * 1e6:>13.2f} {timings['tables'] * 1e6:>12.2f} "
+                  f"{timings['lambdas'] / timings['tables']:>7.1f}x")
+        return
+
+    if args.board_sizes:
+        print(f"{'board':>5} {'max':>4} {'combos':>7} {'build (ms)':>11} {'exhaustive (ms)':>16} {'pruned (ms)':>12} "
+              + " ".join(f"{engine + ' (us)':>16}" for engine in ENGINES))
+        for size, timings in benchmark_board_sizes().items():
+            row = " ".join(f"{timings['evaluate_move'][engine] * 1e6:>16.1f}" for engine in ENGINES)
+            print(f"{f'{size}x{size}':>5} {timings['max_cells']:>4} {timings['combinations']:>7} "
+                  f"{timings['tables_build'] * 1e3:>11.1f} {timings['enumerate_exhaustive'] * 1e3:>16.1f} "
+                  f"{timings['enumerate_pruned'] * 1e3:>12.1f} {row}")
+        return
+
+    if args.exact_distribution:
+        result = benchmark_exact_distribution(args.games, args.workers)
+        sampled, exact = result['sampled'], result['exact']
+        print(f"Sampled ({sampled['total_games']} games): mean {sampled['mean_lines']:.4f}, "
+              f"std {sampled['std_lines']:.4f} in {result['sampled_seconds']:.1f}s")
+        print(f"Exact: mean {exact['mean_lines']:.4f}, std {exact['std_lines']:.4f} in {result['exact_seconds']:.1f}s")
+        return
+
+    if args.batched:
+        for name, games_per_second in benchmark_batched(args.games, args.workers).items():
+            print(f"{name:>18}: {games_per_second:>8.1f} games/s")
+        return
+
+    if args.scaling:
+        print(f"{'workers':>7} {'per-game (g/s)':>15} {'eff':>6} {'chunked (g/s)':>15} {'eff':>6}")
+        for num_workers, timings in benchmark_scaling(args.games, chunk_size=args.chunk_size).items():
+            print(f"{num_workers:>7} {timings['per_game']:>15.1f} {timings['per_game_efficiency']:>6.0%} "
+                  f"{timings['chunked']:>15.1f} {timings['chunked_efficiency']:>6.0%}")
+        return
+
+    results = benchmark_engines()
+
+    print(f"{'cells':>5} " + " ".join(f"{engine + ' (us)':>16}" for engine in ENGINES))
+    for size, timings in results.items():
+        row = " ".join(f"{timings[engine] * 1e6:>16.1f}" for engine in ENGINES)
+        print(f"{size:>5} {row}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""Exact expected-lines solver against the uniformly random opponent
+
+`simulator.run_game` alternates a solver move and a uniformly random
+computer move until 16 cells are selected, then counts completed lines. The
+expectation-maximizing policy for that game is computed here by expectimax
+over every reachable board, bottom-up over dense NumPy arrays indexed by
+board mask (selected-cell count decides whose turn it is: even counts are
+solver moves, odd counts are random moves).
+
+The persisted table keeps only symmetry-canonical solver states, so lookups
+canonicalize the board, binary-search the sorted masks and map the stored
+move back through the inverse transformation.
+"""
+
+import argparse
+import random
+import time
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+import numpy as np
+
+from scoring_config import GAME_CONSTRAINTS
+from solver import BingoSolver, canonical_form, get_tables
+
+BOARD_SIZE = GAME_CONSTRAINTS['board_size']
+MAX_CELLS = GAME_CONSTRAINTS['max_cells']
+
+_POPCOUNT16 = np.array([bin(i).count('1') for i in range(1 << 16)], dtype=np.uint8)
+
+
+def _popcount(masks: np.ndarray) -> np.ndarray:
+    """Vectorized popcount of uint32 masks"""
+    return _POPCOUNT16[masks & 0xFFFF] + _POPCOUNT16[masks >> 16]
+
+
+def _transform_masks(masks: np.ndarray, perm: Tuple[int, ...]) -> np.ndarray:
+    """Apply a cell permutation to an array of board masks"""
+    result = np.zeros_like(masks)
+    for cell, image in enumerate(perm):
+        result |= ((masks >> cell) & 1) << image
+    return result
+
+
+def _canonical_masks(masks: np.ndarray) -> np.ndarray:
+    """Smallest symmetric image of each mask"""
+    canonical = masks.copy()
+    for perm in get_tables().transformation_perms[1:]:
+        np.minimum(canonical, _transform_masks(masks, perm), out=canonical)
+    return canonical
+
+
+class ExactSolver:
+    """Expectation-maximizing move lookup against the random opponent"""
+
+    def __init__(self, masks: np.ndarray, moves: np.ndarray, values: np.ndarray):
+        # Sorted canonical solver-to-move states with their best move and expected final lines
+        self.masks = masks
+        self.moves = moves
+        self.values = values
+
+    def __len__(self) -> int:
+        return len(self.masks)
+
+    @classmethod
+    def build(cls, verbose: bool = False) -> 'ExactSolver':
+        """Run the full expectimax and keep the canonical solver states"""
+        values = np.zeros(1 << BOARD_SIZE, dtype=np.float64)
+        best_moves = np.zeros(1 << BOARD_SIZE, dtype=np.uint8)
+        all_masks = np.arange(1 << BOARD_SIZE, dtype=np.uint32)
+        popcounts = _popcount(all_masks)
+        del all_masks
+        line_masks = np.array(get_tables().line_masks, dtype=np.uint32)
+
+        kept_masks, kept_moves, kept_values = [], [], []
+        for size in range(MAX_CELLS, -1, -1):
+            start = time.perf_counter()
+            layer = np.flatnonzero(popcounts == size).astype(np.uint32)
+
+            if size == MAX_CELLS:
+                # Terminal boards: count completed lines
+                completed = np.zeros(len(layer), dtype=np.float64)
+                for line_mask in line_masks:
+                    completed += (layer & line_mask) == line_mask
+                values[layer] = completed
+            elif size % 2 == 1:
+                # Random computer move: average over free cells
+                total = np.zeros(len(layer), dtype=np.float64)
+                for cell in range(BOARD_SIZE):
+                    bit = np.uint32(1 << cell)
+                    free = (layer & bit) == 0
+                    total[free] += values[layer[free] | bit]
+                values[layer] = total / (BOARD_SIZE - size)
+            else:
+                # Solver move: maximize over free cells, ties go to the lowest cell
+                best = np.full(len(layer), -np.inf)
+                move = np.zeros(len(layer), dtype=np.uint8)
+                for cell in range(BOARD_SIZE):
+                    bit = np.uint32(1 << cell)
+                    candidate = np.where((layer & bit) == 0, values[layer | bit], -np.inf)
+                    better = candidate > best
+                    best[better] = candidate[better]
+                    move[better] = cell
+                values[layer] = best
+                best_moves[layer] = move
+
+                canonical = layer[_canonical_masks(layer) == layer]
+                kept_masks.append(canonical)
+                kept_moves.append(best_moves[canonical])
+                kept_values.append(values[canonical])
+
+            if verbose:
+                print(f"{size:>2} cells: {len(layer):>9} states in {time.perf_counter() - start:.1f}s")
+
+        masks = np.concatenate(kept_masks)
+        order = np.argsort(masks)
+        return cls(masks[order], np.concatenate(kept_moves)[order], np.concatenate(kept_values)[order])
+
+    def _lookup(self, board_mask: int) -> Optional[Tuple[int, float]]:
+        canonical_mask, index = canonical_form(board_mask)
+        position = int(np.searchsorted(self.masks, canonical_mask))
+        if position == len(self.masks) or self.masks[position] != canonical_mask:
+            return None
+        move = get_tables().inverse_perms[index][int(self.moves[position])]
+        return move, float(self.values[position])
+
+    def get_optimal_move(self, board_state: Set[int]) -> Tuple[int, Dict[str, float]]:
+        """Best move and the expected number of completed lines after playing it"""
+        board_mask = 0
+        for cell in board_state:
+            board_mask |= 1 << cell
+        found = self._lookup(board_mask)
+        if found is None:
+            raise KeyError(f"Board {sorted(board_state)} is not a solver-to-move state in the exact table")
+        move, value = found
+        return move, {'expected_lines': value}
+
+    def move_value(self, board_state: Set[int], move: int) -> float:
+        """Expected final completed lines after playing `move` and letting the opponent reply"""
+        board_mask = 0
+        for cell in board_state | {move}:
+            board_mask |= 1 << cell
+        replies = [cell for cell in range(BOARD_SIZE) if not board_mask >> cell & 1]
+        total = 0.0
+        for reply in replies:
+            child = board_mask | 1 << reply
+            if child.bit_count() == MAX_CELLS:
+                total += sum(1 for line_mask in get_tables().line_masks if child & line_mask == line_mask)
+            else:
+                total += self._lookup(child)[1]
+        return total / len(replies)
+
+    def expected_lines(self, board_state: Set[int] = frozenset()) -> float:
+        """Expected final completed lines under optimal play from a solver-to-move board"""
+        return self.get_optimal_move(board_state)[1]['expected_lines']
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(path, masks=self.masks, moves=self.moves, values=self.values)
+
+    @classmethod
+    def load(cls, path: str) -> 'ExactSolver':
+        with np.load(path) as data:
+            return cls(data['masks'], data['moves'], data['values'])
+
+
+_LOADED_TABLES: Dict[str, ExactSolver] = {}
+
+
+def load_exact_solver(path: str) -> ExactSolver:
+    """Load (once per process) a persisted exact table"""
+    if path not in _LOADED_TABLES:
+        _LOADED_TABLES[path] = ExactSolver.load(path)
+    return _LOADED_TABLES[path]
+
+
+def compare_with_heuristic(exact: ExactSolver, num_states: int = 1000, seed: int = 0) -> Dict[str, float]:
+    """Agreement and expected-lines regret of BingoSolver's move on random solver-to-move states"""
+    rng = random.Random(seed)
+    agree = 0
+    regret = 0.0
+    for _ in range(num_states):
+        size = 2 * rng.randrange(MAX_CELLS // 2)
+        board_state = set(rng.sample(range(BOARD_SIZE), size))
+        best_move, best = exact.get_optimal_move(board_state)
+        move, _ = BingoSolver(board_state, engine='bitboard').get_optimal_move()
+        if move == best_move:
+            agree += 1
+        else:
+            regret += best['expected_lines'] - exact.move_value(board_state, move)
+    return {
+        'states': num_states,
+        'agreement_rate': agree / num_states * 100,
+        'mean_regret': regret / num_states
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the exact expectimax table")
+    parser.add_argument('--output', default='results/exact_table.npz')
+    parser.add_argument('--compare', type=int, default=1000, help="Random states to compare against the heuristic")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    solver = ExactSolver.build(verbose=True)
+    Path(args.output).parent.mkdir(exist_ok=True)
+    solver.save(args.output)
+    print(f"Wrote {len(solver)} canonical states to {args.output} in {time.perf_counter() - start:.1f}s")
+    print(f"Expected completed lines under optimal play: {solver.expected_lines():.4f}")
+
+    if args.compare:
+        comparison = compare_with_heuristic(solver, args.compare)
+        print(f"Heuristic agrees with the exact move on {comparison['agreement_rate']:.1f}% of "
+              f"{comparison['states']} random states (mean regret {comparison['mean_regret']:.4f} lines)")
+
+
+if __name__ == "__main__":
+    main()
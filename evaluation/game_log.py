@@ -0,0 +1,129 @@
+"""Columnar on-disk game log
+
+A log is a directory holding one raw binary file per column of the packed
+layout of `simulator.pack_results` (fixed-width NumPy dtypes, one row per
+game) plus a `meta.json` with the row count. Chunks are appended as they
+arrive, and `open_game_log` maps the columns back with `np.memmap`, so a log
+of millions of games can be analyzed without loading it or building
+GameResult objects.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Iterator
+
+import numpy as np
+
+from aggregation import CACHE_KEYS, SCORE_KEYS, GameAggregator
+
+# Column name -> (dtype, per-game shape)
+COLUMNS = {
+    'moves': (np.uint8, (16,)),
+    'final_boards': (np.uint32, ()),
+    'completed_lines': (np.uint8, ()),
+    'scores': (np.float32, (8, len(SCORE_KEYS))),
+    'pattern_indices': (np.int8, (8,)),
+    'cache_stats': (np.uint32, (len(CACHE_KEYS),))
+}
+META_FILE = 'meta.json'
+
+
+def _row_bytes(dtype, shape) -> int:
+    return np.dtype(dtype).itemsize * int(np.prod(shape, dtype=np.int64))
+
+
+class GameLogWriter:
+    """Append packed game chunks to a log directory
+
+    `start` keeps the first `start` games of an existing log (e.g. up to a
+    simulation checkpoint) and appends after them; anything later is dropped.
+    A ValueError is raised if the log holds fewer than `start` games.
+    """
+
+    def __init__(self, path: str, start: int = 0):
+        self.path = Path(path)
+        if start:
+            self._check_resumable(start)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.count = start
+        self._files = {}
+        for name, (dtype, shape) in COLUMNS.items():
+            file_path = self.path / f'{name}.bin'
+            if start:
+                with open(file_path, 'r+b') as file:
+                    file.truncate(start * _row_bytes(dtype, shape))
+            self._files[name] = open(file_path, 'ab' if start else 'wb')
+        self._write_meta()
+
+    def _check_resumable(self, start: int) -> None:
+        meta_path = self.path / META_FILE
+        if not meta_path.exists():
+            raise ValueError(f"Cannot resume game log {self.path} at game {start}: it has no {META_FILE}")
+        count = json.loads(meta_path.read_text())['count']
+        if count < start:
+            raise ValueError(f"Cannot resume game log {self.path} at game {start}: it only holds {count} games")
+        for name, (dtype, shape) in COLUMNS.items():
+            file_path = self.path / f'{name}.bin'
+            if not file_path.exists() or file_path.stat().st_size < start * _row_bytes(dtype, shape):
+                raise ValueError(f"Cannot resume game log {self.path} at game {start}: "
+                                 f"{file_path.name} is missing or shorter than {start} games")
+
+    def append(self, arrays: Dict[str, np.ndarray]) -> None:
+        """Write one chunk; columns missing from `arrays` are written as zeros"""
+        num_games = len(arrays['completed_lines'])
+        for name, (dtype, shape) in COLUMNS.items():
+            column = arrays.get(name)
+            if column is None:
+                column = np.zeros((num_games,) + shape, dtype=dtype)
+            self._files[name].write(np.ascontiguousarray(column, dtype=dtype).tobytes())
+            self._files[name].flush()
+        self.count += num_games
+        self._write_meta()
+
+    def _write_meta(self) -> None:
+        meta = {
+            'count': self.count,
+            'columns': {name: {'dtype': np.dtype(dtype).str, 'shape': list(shape)}
+                        for name, (dtype, shape) in COLUMNS.items()}
+        }
+        (self.path / META_FILE).write_text(json.dumps(meta, indent=2))
+
+    def close(self) -> None:
+        for file in self._files.values():
+            file.close()
+
+    def __enter__(self) -> 'GameLogWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def open_game_log(path: str) -> Dict[str, np.ndarray]:
+    """Memory-map every column of a log (read-only)"""
+    path = Path(path)
+    meta = json.loads((path / META_FILE).read_text())
+    count = meta['count']
+    columns = {}
+    for name, column in meta['columns'].items():
+        shape = (count,) + tuple(column['shape'])
+        if count == 0:
+            columns[name] = np.zeros(shape, dtype=column['dtype'])
+        else:
+            columns[name] = np.memmap(path / f'{name}.bin', dtype=column['dtype'], mode='r', shape=shape)
+    return columns
+
+
+def iter_chunks(arrays: Dict[str, np.ndarray], chunk_size: int = 100_000) -> Iterator[Dict[str, np.ndarray]]:
+    """Consecutive row slices of every column"""
+    count = len(arrays['completed_lines'])
+    for start in range(0, count, chunk_size):
+        yield {name: column[start:start + chunk_size] for name, column in arrays.items()}
+
+
+def aggregate_game_log(path: str, chunk_size: int = 100_000) -> GameAggregator:
+    """Stream a log through a GameAggregator, `chunk_size` games at a time"""
+    aggregator = GameAggregator()
+    for chunk in iter_chunks(open_game_log(path), chunk_size):
+        aggregator.update_arrays(chunk)
+    return aggregator
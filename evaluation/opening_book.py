@@ -0,0 +1,155 @@
+"""Precomputed opening book for the first plies of a game
+
+The book maps every canonical (symmetry-reduced) board with at most
+`max_cells` selected cells to the solver's best moves for it. It is stored
+as a compressed .npz file stamped with a hash of scoring_config.py, so a
+config change invalidates the book instead of returning stale moves. It
+also records `solver.config_key` of the config it was solved with, and
+solvers with a different config (see solver.resolve_config) skip it.
+"""
+
+import argparse
+import hashlib
+import time
+import warnings
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from solver import BingoSolver, canonical_form, config_key, get_tables
+
+SCORING_CONFIG_PATH = Path(__file__).with_name('scoring_config.py')
+SCORE_KEYS = ('three_line', 'four_line', 'five_line', 'total')
+
+
+def config_hash() -> str:
+    """SHA-256 of the scoring_config.py source the book was built against"""
+    return hashlib.sha256(SCORING_CONFIG_PATH.read_bytes()).hexdigest()
+
+
+def enumerate_canonical_states(max_cells: int) -> List[Set[int]]:
+    """All canonical board masks with up to `max_cells` selected cells, grouped by size"""
+    tables = get_tables()
+    levels = [{0}]
+    for _ in range(max_cells):
+        next_level = set()
+        for mask in levels[-1]:
+            for cell in range(25):
+                if not mask >> cell & 1:
+                    next_level.add(canonical_form(mask | 1 << cell, tables)[0])
+        levels.append(next_level)
+    return levels
+
+
+class OpeningBook:
+    """Canonical board mask -> moves tied for the best total, with their scores"""
+
+    def __init__(self, entries: Dict[int, Tuple[Tuple[int, Dict[str, float]], ...]], max_cells: int, version: str,
+                 config_key: Optional[str] = None):
+        self.entries = entries
+        self.max_cells = max_cells
+        self.version = version
+        # Config the moves were solved with; BingoSolver only consults books matching its own
+        self.config_key = config_key
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def lookup(self, board_mask: int) -> Optional[Tuple[int, Dict[str, float]]]:
+        """Best move for a board, or None if the board is not in the book"""
+        if board_mask.bit_count() > self.max_cells:
+            return None
+        canonical_mask, index = canonical_form(board_mask)
+        entry = self.entries.get(canonical_mask)
+        if not entry:
+            return None
+        inverse = get_tables().inverse_perms[index]
+        return min(((inverse[move], score) for move, score in entry), key=lambda item: item[0])
+
+    def save(self, path: str) -> None:
+        """Write the book as flat arrays: masks, per-state move offsets, moves and scores"""
+        masks = sorted(self.entries)
+        offsets = [0]
+        moves = []
+        scores = []
+        for mask in masks:
+            for move, score in self.entries[mask]:
+                moves.append(move)
+                scores.append([score[key] for key in SCORE_KEYS])
+            offsets.append(len(moves))
+
+        np.savez_compressed(
+            path,
+            masks=np.array(masks, dtype=np.uint32),
+            offsets=np.array(offsets, dtype=np.uint32),
+            moves=np.array(moves, dtype=np.uint8),
+            scores=np.array(scores, dtype=np.float64).reshape(-1, len(SCORE_KEYS)),
+            max_cells=np.array(self.max_cells),
+            version=np.array(self.version),
+            config_key=np.array(self.config_key)
+        )
+
+    @classmethod
+    def load(cls, path: str) -> 'OpeningBook':
+        with np.load(path) as data:
+            masks = data['masks'].tolist()
+            offsets = data['offsets'].tolist()
+            moves = data['moves'].tolist()
+            scores = data['scores'].tolist()
+            max_cells = int(data['max_cells'])
+            version = str(data['version'])
+            # Books predating the key were always solved with scoring_config.py's defaults
+            key = str(data['config_key']) if 'config_key' in data else config_key()
+
+        entries = {}
+        for i, mask in enumerate(masks):
+            entries[mask] = tuple(
+                (moves[j], dict(zip(SCORE_KEYS, scores[j])))
+                for j in range(offsets[i], offsets[i + 1])
+            )
+        return cls(entries, max_cells, version, key)
+
+
+def build_opening_book(max_cells: int = 4, engine: str = 'vectorized', config: Optional[Dict] = None) -> OpeningBook:
+    """Solve every canonical state with up to `max_cells` cells, under `config` overrides"""
+    entries = {}
+    for level in enumerate_canonical_states(max_cells):
+        for mask in level:
+            board_state = {cell for cell in range(25) if mask >> cell & 1}
+            entries[mask] = tuple(BingoSolver(board_state, engine=engine, config=config)._best_moves())
+    return OpeningBook(entries, max_cells, config_hash(), config_key(config))
+
+
+_LOADED_BOOKS: Dict[str, Optional[OpeningBook]] = {}
+
+
+def load_opening_book(path: str) -> Optional[OpeningBook]:
+    """Load (once per process) a book, returning None if it is stale or missing"""
+    if path not in _LOADED_BOOKS:
+        book = None
+        if Path(path).exists():
+            book = OpeningBook.load(path)
+            if book.version != config_hash():
+                warnings.warn(f"Opening book {path} was built for a different scoring_config.py; ignoring it")
+                book = None
+        _LOADED_BOOKS[path] = book
+    return _LOADED_BOOKS[path]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the solver opening book")
+    parser.add_argument('--max-cells', type=int, default=4, help="Largest board size (selected cells) to include")
+    parser.add_argument('--output', default='results/opening_book.npz')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    book = build_opening_book(args.max_cells)
+    Path(args.output).parent.mkdir(exist_ok=True)
+    book.save(args.output)
+    print(f"Wrote {len(book)} canonical states (<= {args.max_cells} cells) to {args.output} "
+          f"in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
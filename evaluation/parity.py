@@ -0,0 +1,201 @@
+"""Score parity and regression harness for the solver engines
+
+A golden file records, for a corpus of board states, every move's
+three_line/four_line/five_line/total score from `BingoSolver.evaluate_move`
+on the reference 'set' engine, plus the move `get_optimal_move` plays. It is
+a compressed .npz file stamped with a hash of scoring_config.py. Any other
+engine, with or without the transposition table, is then diffed against it
+in parallel:
+```
+python parity.py build --exhaustive 4 --random 2000
+python parity.py check --engine bitboard --engine vectorized --engine incremental --engine cached
+```
+"""
+
+import argparse
+import random
+import sys
+import time
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from opening_book import config_hash, enumerate_canonical_states
+from scoring_config import GAME_CONSTRAINTS
+from solver import ENGINES, BingoSolver, build_tables, get_transposition_table
+
+REFERENCE_ENGINE = 'set'
+SCORE_KEYS = ('three_line', 'four_line', 'five_line', 'total')
+# Pseudo-engine: the reference engine with get_optimal_move backed by the transposition table
+CACHED = 'cached'
+
+
+def generate_corpus(exhaustive_cells: int = 4, random_states: int = 2000, seed: int = 0) -> np.ndarray:
+    """Board masks: every canonical board up to `exhaustive_cells` cells, then random boards of any size
+    that still has a move left"""
+    masks = [mask for level in enumerate_canonical_states(exhaustive_cells) for mask in sorted(level)]
+    max_cells = GAME_CONSTRAINTS['max_cells']
+    rng = random.Random(seed)
+    for _ in range(random_states):
+        cells = rng.sample(range(25), rng.randint(0, max_cells - 1))
+        masks.append(sum(1 << cell for cell in cells))
+    return np.array(masks, dtype=np.uint32)
+
+
+def _make_solver(mask: int, engine: str) -> BingoSolver:
+    board_state = {cell for cell in range(25) if mask >> cell & 1}
+    if engine == CACHED:
+        return BingoSolver(board_state, engine=REFERENCE_ENGINE, use_cache=True)
+    if engine == 'incremental':
+        # Reach the board through add_cell, as run_game does, so counter updates are exercised too
+        solver = BingoSolver(set(), engine=engine)
+        solver.ensure_counters()
+        for cell in sorted(board_state):
+            solver.add_cell(cell)
+        return solver
+    return BingoSolver(board_state, engine=engine)
+
+
+def evaluate_chunk(task: Tuple[np.ndarray, str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Scores of every move (NaN for taken cells) and the optimal move for a chunk of boards"""
+    masks, engine = task
+    scores = np.full((len(masks), 25, len(SCORE_KEYS)), np.nan)
+    best_moves = np.empty(len(masks), dtype=np.int8)
+    for i, mask in enumerate(masks.tolist()):
+        solver = _make_solver(mask, engine)
+        for move in solver.get_possible_moves():
+            score = solver.evaluate_move(move)
+            scores[i, move] = [score[key] for key in SCORE_KEYS]
+        best_moves[i] = solver.get_optimal_move()[0]
+    return scores, best_moves
+
+
+def evaluate_corpus(masks: np.ndarray, engine: str, num_workers: int = 4,
+                    chunk_size: int = 200) -> Tuple[np.ndarray, np.ndarray]:
+    """evaluate_chunk over the whole corpus, spread over a process pool"""
+    tasks = [(masks[start:start + chunk_size], engine) for start in range(0, len(masks), chunk_size)]
+    if num_workers <= 1:
+        build_tables()
+        chunks = [evaluate_chunk(task) for task in tasks]
+    else:
+        with Pool(num_workers, initializer=build_tables) as pool:
+            chunks = pool.map(evaluate_chunk, tasks)
+    if not chunks:
+        return np.empty((0, 25, len(SCORE_KEYS))), np.empty(0, dtype=np.int8)
+    return np.concatenate([scores for scores, _ in chunks]), np.concatenate([moves for _, moves in chunks])
+
+
+class GoldenScores:
+    """Reference scores for a corpus of boards"""
+
+    def __init__(self, masks: np.ndarray, scores: np.ndarray, best_moves: np.ndarray, version: str):
+        self.masks = masks
+        self.scores = scores
+        self.best_moves = best_moves
+        self.version = version
+
+    def __len__(self) -> int:
+        return len(self.masks)
+
+    @classmethod
+    def build(cls, masks: np.ndarray, num_workers: int = 4) -> 'GoldenScores':
+        scores, best_moves = evaluate_corpus(masks, REFERENCE_ENGINE, num_workers)
+        return cls(masks, scores, best_moves, config_hash())
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(path, masks=self.masks, scores=self.scores, best_moves=self.best_moves,
+                            version=np.array(self.version))
+
+    @classmethod
+    def load(cls, path: str) -> 'GoldenScores':
+        with np.load(path) as data:
+            return cls(data['masks'], data['scores'], data['best_moves'], str(data['version']))
+
+
+def diff_engine(golden: GoldenScores, engine: str, num_workers: int = 4, rtol: float = 1e-9,
+                atol: float = 1e-9) -> Dict:
+    """Compare an engine's scores and optimal moves against the golden file"""
+    if engine == CACHED:
+        get_transposition_table().clear()
+    start = time.perf_counter()
+    scores, best_moves = evaluate_corpus(golden.masks, engine, num_workers)
+    elapsed = time.perf_counter() - start
+
+    taken = np.isnan(golden.scores)
+    close = np.isclose(scores, golden.scores, rtol=rtol, atol=atol) | (taken & np.isnan(scores))
+    abs_diff = np.where(taken, 0.0, np.abs(scores - golden.scores))
+    score_mismatches = np.flatnonzero(~close.all(axis=(1, 2)))
+    move_mismatches = np.flatnonzero(best_moves != golden.best_moves)
+    return {
+        'engine': engine,
+        'states': len(golden),
+        'score_mismatches': score_mismatches.tolist(),
+        'move_mismatches': move_mismatches.tolist(),
+        'best_moves': best_moves,
+        'max_abs_diff': {key: float(np.nan_to_num(abs_diff[..., i], nan=np.inf).max(initial=0.0))
+                         for i, key in enumerate(SCORE_KEYS)},
+        'elapsed': elapsed
+    }
+
+
+def _board(mask: int) -> List[int]:
+    return [cell for cell in range(25) if mask >> cell & 1]
+
+
+def print_report(golden: GoldenScores, report: Dict, max_reported: int = 5) -> None:
+    status = 'OK' if not report['score_mismatches'] and not report['move_mismatches'] else 'MISMATCH'
+    max_diffs = ', '.join(f"{key}={value:.3g}" for key, value in report['max_abs_diff'].items())
+    print(f"{report['engine']:>12}: {status}  {len(report['score_mismatches'])} score / "
+          f"{len(report['move_mismatches'])} move mismatches over {report['states']} states "
+          f"in {report['elapsed']:.1f}s  (max |diff| {max_diffs})")
+    for index in report['move_mismatches'][:max_reported]:
+        print(f"{'':>14}board {_board(int(golden.masks[index]))}: "
+              f"golden move {golden.best_moves[index]}, {report['engine']} plays {report['best_moves'][index]}")
+    for index in report['score_mismatches'][:max_reported]:
+        print(f"{'':>14}board {_board(int(golden.masks[index]))}: scores differ")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build or check the solver score golden file")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build_parser = subparsers.add_parser('build', help="Score a corpus with the reference engine")
+    build_parser.add_argument('--exhaustive', type=int, default=4,
+                              help="Include every canonical board with up to this many cells")
+    build_parser.add_argument('--random', type=int, default=2000, help="Number of random boards to include")
+    build_parser.add_argument('--seed', type=int, default=0)
+    check_parser = subparsers.add_parser('check', help="Diff engines against the golden file")
+    check_parser.add_argument('--engine', action='append', choices=[*ENGINES, CACHED],
+                              help="Engine to check (repeatable; default: all but the reference)")
+    check_parser.add_argument('--rtol', type=float, default=1e-9)
+    check_parser.add_argument('--atol', type=float, default=1e-9)
+    for sub in (build_parser, check_parser):
+        sub.add_argument('--golden', default='results/golden_scores.npz')
+        sub.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        start = time.perf_counter()
+        golden = GoldenScores.build(generate_corpus(args.exhaustive, args.random, args.seed), args.workers)
+        Path(args.golden).parent.mkdir(exist_ok=True)
+        golden.save(args.golden)
+        print(f"Wrote golden scores for {len(golden)} states to {args.golden} "
+              f"in {time.perf_counter() - start:.1f}s")
+        return 0
+
+    golden = GoldenScores.load(args.golden)
+    if golden.version != config_hash():
+        print(f"{args.golden} was built for a different scoring_config.py; rebuild it first")
+        return 2
+    engines = args.engine or [engine for engine in (*ENGINES, CACHED) if engine != REFERENCE_ENGINE]
+    failed = False
+    for engine in engines:
+        report = diff_engine(golden, engine, args.workers, args.rtol, args.atol)
+        print_report(golden, report)
+        failed |= bool(report['score_mismatches'] or report['move_mismatches'])
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
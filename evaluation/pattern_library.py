@@ -0,0 +1,163 @@
+"""Pattern library files and a miner that harvests patterns from game logs
+
+A library file is JSON holding patterns in the KNOWN_PATTERNS layout
+(`cells`, `optimal_move`, `description`), stored in canonical orientation.
+`load_pattern_library` indexes them in a `solver.PatternLibrary`, keyed on
+canonical board masks, for `BingoSolver(pattern_library=...)`.
+
+The miner replays logged games (see game_log.py) and, for every board the
+player moved from, collects the mean completed lines that followed each
+move, with moves that are equivalent under the board's own symmetries
+merged. Where another move was observed often enough, did significantly
+better than the heuristic's move and is not merely tied with it on score,
+the board becomes a pattern. A log from one deterministic policy shows a
+single move per board and mines an empty library: mine logs that mix
+policies, e.g. a `BingoSimulator(epsilon=0.1, game_log_path=...)` run,
+which plays random moves at a rate of epsilon, or the heuristic's and
+exact_solver.py's logs together.
+"""
+
+import argparse
+import json
+import math
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from game_log import iter_chunks, open_game_log
+from solver import KNOWN_PATTERNS, BingoSolver, PatternLibrary, SolverTables, canonical_form, get_tables, transform_mask
+
+
+def save_pattern_library(library: PatternLibrary, path: str) -> None:
+    patterns = [
+        {'cells': [cell for cell in range(25) if mask >> cell & 1], 'optimal_move': move, 'description': description}
+        for mask, (move, description) in library.entries.items()
+    ]
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({'patterns': patterns}, f, indent=1)
+
+
+_LOADED_LIBRARIES: Dict[str, PatternLibrary] = {}
+
+
+def load_pattern_library(path: str, include_known: bool = True) -> PatternLibrary:
+    """Load (once per process) a library file, after KNOWN_PATTERNS unless `include_known` is False"""
+    key = f'{path}:{include_known}'
+    if key not in _LOADED_LIBRARIES:
+        with open(path) as f:
+            patterns = json.load(f)['patterns']
+        _LOADED_LIBRARIES[key] = PatternLibrary.from_patterns((KNOWN_PATTERNS if include_known else []) + patterns)
+    return _LOADED_LIBRARIES[key]
+
+
+def _stabilizer(canonical_mask: int, tables: SolverTables) -> List[tuple]:
+    """Cell permutations of the transformations that map the board onto itself"""
+    return [perm for index, perm in enumerate(tables.transformation_perms)
+            if transform_mask(canonical_mask, index, tables) == canonical_mask]
+
+
+def canonical_move(canonical_mask: int, move: int, tables: SolverTables, stabilizers: Optional[Dict] = None) -> int:
+    """Smallest cell `move` maps to under the symmetries of a canonical board
+
+    Moves that are the same up to the board's symmetry get the same cell.
+    `stabilizers` caches _stabilizer per board across calls.
+    """
+    stabilizers = {} if stabilizers is None else stabilizers
+    if canonical_mask not in stabilizers:
+        stabilizers[canonical_mask] = _stabilizer(canonical_mask, tables)
+    return min(perm[move] for perm in stabilizers[canonical_mask])
+
+
+def collect_move_outcomes(log_paths: List[str], min_cells: int = 2) -> Dict[int, Dict[int, List[float]]]:
+    """Canonical board -> canonical player move (see canonical_move) -> [games, sum of lines, sum of squared lines]"""
+    tables = get_tables()
+    stabilizers = {}
+    outcomes = defaultdict(lambda: defaultdict(lambda: [0, 0.0, 0.0]))
+    for path in log_paths:
+        for chunk in iter_chunks(open_game_log(path)):
+            for moves, lines in zip(chunk['moves'].tolist(), chunk['completed_lines'].tolist()):
+                board = 0
+                for turn in range(0, len(moves), 2):
+                    if turn >= min_cells:
+                        canonical_mask, index = canonical_form(board, tables)
+                        move = canonical_move(canonical_mask, tables.transformation_perms[index][moves[turn]],
+                                              tables, stabilizers)
+                        stats = outcomes[canonical_mask][move]
+                        stats[0] += 1
+                        stats[1] += lines
+                        stats[2] += lines * lines
+                    board |= 1 << moves[turn] | (1 << moves[turn + 1] if turn + 1 < len(moves) else 0)
+    return outcomes
+
+
+def _mean_and_variance(stats: List[float]):
+    games, total, squares = stats
+    mean = total / games
+    return mean, max(squares / games - mean * mean, 0.0) * games / max(games - 1, 1)
+
+
+def mine_patterns(log_paths: List[str], min_games: int = 30, z: float = 2.0, min_cells: int = 2,
+                  limit: int = 1000, engine: str = 'vectorized') -> PatternLibrary:
+    """Boards where an observed move beat the heuristic's by more than `z` standard errors
+
+    Both moves need `min_games` observations, and moves scoring the same
+    total as the heuristic's are skipped (the heuristic's choice among them
+    is only its tie-break). Patterns are ranked by the lines gained times
+    the number of games reaching the board, and the top `limit` are kept.
+    The logs must mix policies (see the module docstring), or no board has
+    two observed moves and the library is empty.
+    """
+    tables = get_tables()
+    stabilizers = {}
+    candidates = []
+    for canonical_mask, moves in collect_move_outcomes(log_paths, min_cells).items():
+        observed = {move: stats for move, stats in moves.items() if stats[0] >= min_games}
+        if len(observed) < 2:
+            continue
+        board_state = {cell for cell in range(25) if canonical_mask >> cell & 1}
+        solver = BingoSolver(board_state, engine=engine)
+        heuristic_move, heuristic_score = solver.get_optimal_move()
+        heuristic_move = canonical_move(canonical_mask, heuristic_move, tables, stabilizers)
+        if heuristic_move not in observed:
+            continue
+        best_move = max(observed, key=lambda move: _mean_and_variance(observed[move])[0])
+        if best_move == heuristic_move or solver.evaluate_move(best_move)['total'] == heuristic_score['total']:
+            continue
+        best_mean, best_variance = _mean_and_variance(observed[best_move])
+        heuristic_mean, heuristic_variance = _mean_and_variance(observed[heuristic_move])
+        gain = best_mean - heuristic_mean
+        std_err = math.sqrt(best_variance / observed[best_move][0] + heuristic_variance / observed[heuristic_move][0])
+        if gain <= z * std_err:
+            continue
+        visits = sum(stats[0] for stats in moves.values())
+        description = (f"Mined: {best_mean:.2f} lines over {observed[best_move][0]} games vs "
+                       f"{heuristic_mean:.2f} for heuristic move {heuristic_move}")
+        candidates.append((gain * visits, canonical_mask, best_move, description))
+
+    candidates.sort(reverse=True)
+    library = PatternLibrary()
+    for _, canonical_mask, move, description in candidates[:limit]:
+        library.add(canonical_mask, move, description)
+    return library
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mine a pattern library from simulation game logs")
+    parser.add_argument('logs', nargs='+', help="Game log directories (see BingoSimulator(game_log_path=...))")
+    parser.add_argument('--output', default='results/patterns.json')
+    parser.add_argument('--min-games', type=int, default=30, help="Observations required for both compared moves")
+    parser.add_argument('--z', type=float, default=2.0, help="Required gain in standard errors")
+    parser.add_argument('--min-cells', type=int, default=2, help="Skip boards with fewer selected cells")
+    parser.add_argument('--limit', type=int, default=1000, help="Keep at most this many patterns")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    library = mine_patterns(args.logs, args.min_games, args.z, args.min_cells, args.limit)
+    save_pattern_library(library, args.output)
+    print(f"Wrote {len(library)} patterns to {args.output} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
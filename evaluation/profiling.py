@@ -0,0 +1,71 @@
+"""Opt-in per-phase timing counters for the solver hot paths
+
+Instrumented code reads the module-level `ACTIVE` profile and only calls
+`perf_counter_ns` when it is set, so the disabled cost is one global lookup
+per phase. Profiles are plain counters and merge across Pool workers like
+`GameAggregator`, which carries one per chunk.
+"""
+
+from collections import Counter
+from time import perf_counter_ns
+from typing import Dict, Optional
+
+
+class PhaseProfile:
+    """Call counts and cumulative nanoseconds per named phase"""
+
+    def __init__(self):
+        self.calls = Counter()
+        self.nanos = Counter()
+
+    def __bool__(self) -> bool:
+        return bool(self.calls)
+
+    def record(self, phase: str, start_ns: int) -> None:
+        """Count one call of `phase` that started at `start_ns` (a perf_counter_ns value)"""
+        self.nanos[phase] += perf_counter_ns() - start_ns
+        self.calls[phase] += 1
+
+    def merge(self, other: 'PhaseProfile') -> 'PhaseProfile':
+        self.calls.update(other.calls)
+        self.nanos.update(other.nanos)
+        return self
+
+    def to_dict(self) -> Dict:
+        return {'calls': dict(self.calls), 'nanos': dict(self.nanos)}
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> 'PhaseProfile':
+        profile = cls()
+        profile.calls = Counter(state['calls'])
+        profile.nanos = Counter(state['nanos'])
+        return profile
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """Per phase: calls, total milliseconds and mean microseconds per call, slowest first"""
+        return {
+            phase: {
+                'calls': self.calls[phase],
+                'total_ms': nanos / 1e6,
+                'mean_us': nanos / self.calls[phase] / 1e3
+            }
+            for phase, nanos in self.nanos.most_common()
+        }
+
+
+# Profile receiving the timings of this process, or None when profiling is off
+ACTIVE: Optional[PhaseProfile] = None
+
+
+def enable() -> PhaseProfile:
+    """Start recording into a fresh profile and return it"""
+    global ACTIVE
+    ACTIVE = PhaseProfile()
+    return ACTIVE
+
+
+def disable() -> Optional[PhaseProfile]:
+    """Stop recording and return the profile that was active"""
+    global ACTIVE
+    profile, ACTIVE = ACTIVE, None
+    return profile
@@ -1,7 +1,8 @@
 import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
-from simulator import BingoSimulator
+from simulator import BingoSimulator, OPPONENTS
+import argparse
 import json
 from pathlib import Path
 import numpy as np
@@ -43,7 +44,8 @@ def plot_move_frequencies(move_freq: dict, save_path: str = None):
         plt.savefig(save_path)
     plt.close()
 
-def save_results(stats: dict, move_freq: dict, score_patterns: dict, pattern_stats: dict, output_dir: str):
+def save_results(stats: dict, move_freq: dict, score_patterns: dict, pattern_stats: dict, output_dir: str,
+                 profile: dict = None):
     """Save all results to JSON files"""
     output_path = Path(output_dir)
     output_path.mkdir(exist_ok=True)
@@ -64,23 +66,56 @@ def save_results(stats: dict, move_freq: dict, score_patterns: dict, pattern_sta
     with open(output_path / 'pattern_recognition.json', 'w') as f:
         json.dump(pattern_stats, f, indent=2)
 
+    # Save per-phase solver timings, if the run was profiled
+    if profile:
+        with open(output_path / 'profile.json', 'w') as f:
+            json.dump(profile, f, indent=2)
+
 def main():
+    parser = argparse.ArgumentParser(description="Run the Bingo strategy simulation")
+    parser.add_argument('--games', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--chunk-size', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--checkpoint-every', type=int, default=10,
+                        help="Chunks between checkpoints written to results/checkpoint.json")
+    parser.add_argument('--resume', action='store_true', help="Continue from results/checkpoint.json")
+    parser.add_argument('--opponent', choices=[name for name in OPPONENTS if name != 'replay'], default='uniform',
+                        help="Computer player strategy")
+    parser.add_argument('--target-half-width', type=float, default=None,
+                        help="Stop once the 95%% confidence interval on mean lines is this narrow (--games is the budget)")
+    parser.add_argument('--profile', action='store_true',
+                        help="Record per-phase solver timings and save them to results/profile.json")
+    args = parser.parse_args()
+
     # Create output directory
     output_dir = Path('results')
     output_dir.mkdir(exist_ok=True)
-    
-    # Initialize and run simulation
-    simulator = BingoSimulator(num_games=5000)
-    simulator.run_simulation(num_workers=8)
+    checkpoint_path = output_dir / 'checkpoint.json'
+    if not args.resume and checkpoint_path.exists():
+        checkpoint_path.unlink()
+    
+    # Initialize and run simulation (per-game results are not needed for the summaries)
+    simulator = BingoSimulator(num_games=args.games, use_cache=True, seed=args.seed, keep_results=False,
+                               opponent=OPPONENTS[args.opponent](), profile=args.profile)
+    precision = None
+    if args.target_half_width is not None:
+        precision = simulator.run_adaptive(target_half_width=args.target_half_width, max_games=args.games,
+                                           num_workers=args.workers, chunk_size=args.chunk_size)
+    else:
+        simulator.run_simulation(num_workers=args.workers, chunk_size=args.chunk_size,
+                                 checkpoint_path=str(checkpoint_path), checkpoint_every=args.checkpoint_every)
     
     # Collect results
     stats = simulator.get_statistics()
     move_freq = simulator.analyze_move_patterns()
     score_patterns = simulator.analyze_score_patterns()
     pattern_stats = simulator.analyze_pattern_recognition()
+    cache_stats = simulator.analyze_cache()
+    profile = simulator.analyze_profile()
     
     # Save results
-    save_results(stats, move_freq, score_patterns, pattern_stats, str(output_dir))
+    save_results(stats, move_freq, score_patterns, pattern_stats, str(output_dir), profile)
     
     # Create visualizations
     plot_line_distribution(stats, str(output_dir / 'line_distribution.png'))
@@ -93,12 +128,25 @@ def main():
     print(f"Standard deviation: {stats['std_lines']:.2f}")
     print(f"Minimum lines: {stats['min_lines']}")
     print(f"Maximum lines: {stats['max_lines']}")
+    if precision is not None:
+        status = "reached" if precision['target_met'] else "not reached within the game budget"
+        print(f"95% confidence interval: +/-{precision['mean_half_width']:.4f} lines (target {status})")
     
     print("\nPattern Recognition Statistics:")
     print(f"Total pattern matches: {pattern_stats['total_matches']}")
     print(f"Pattern match rate: {pattern_stats['match_rate']:.2f}%")
     print(f"Most common pattern: {pattern_stats['most_common_pattern']}")
     
+    print("\nTransposition Table:")
+    print(f"Hits: {cache_stats['hits']}, misses: {cache_stats['misses']}, evictions: {cache_stats['evictions']}")
+    print(f"Hit rate: {cache_stats['hit_rate']:.2f}%")
+    
+    if profile:
+        print("\nSolver Profile (slowest phases first):")
+        for phase, timing in profile.items():
+            print(f"{phase:>28}: {timing['calls']:>10} calls, {timing['total_ms']:>10.1f} ms, "
+                  f"{timing['mean_us']:>8.2f} us/call")
+    
     print("\nScore Patterns:")
     print(f"Average three-line score: {score_patterns['mean_three_line']:.2f}")
     print(f"Average four-line score: {score_patterns['mean_four_line']:.2f}")
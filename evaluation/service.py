@@ -0,0 +1,359 @@
+"""Local move-evaluation service with micro-batching, plus a load generator
+
+The service answers `BingoSolver.get_optimal_move` queries over HTTP:
+```
+python service.py serve --port 8765 --workers 4
+curl -d '{"board": [0, 6, 12]}' http://127.0.0.1:8765/evaluate
+python service.py load --port 8765 --clients 64 --requests 5000
+```
+`POST /evaluate` takes `{"board": [cells]}` and returns `{"move", "score"}`
+(move -1 and score null on a full board), or `{"boards": [...]}` and returns
+`{"results": [...]}`. `GET /stats` reports cache and batching counters.
+
+Each board is reduced to its canonical form under the 8 symmetries and
+looked up in a transposition table; misses for the same canonical board
+share one pending future, and distinct misses are coalesced for up to
+`max_wait_ms` into one batch scored by `evaluate_all_moves_batch` in a
+process pool, with up to one batch in flight per worker. Answers match the
+'set' engine, including the lowest-cell tie-break.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from solver import (TranspositionTable, canonical_form, evaluate_all_moves_batch, get_pattern_library, get_tables,
+                    resolve_config)
+
+Entry = Tuple[Tuple[int, Dict[str, float]], ...]
+
+
+def init_worker(config: Optional[Dict] = None) -> None:
+    """Pool initializer: build the solver tables for the service's config"""
+    config = resolve_config(config)
+    get_tables(config['line_scores'], config['game_constraints'])
+
+
+def evaluate_boards(task: Tuple[List[int], Optional[Dict]]) -> List[Entry]:
+    """Moves tied for the best total, with their score dicts, for each board mask
+
+    Mirrors BingoSolver.get_optimal_move on the vectorized engine: a
+    pattern match gives a single move, a full board gives no moves.
+    """
+    masks, config = task
+    config = resolve_config(config)
+    tables = get_tables(config['line_scores'], config['game_constraints'])
+    library = get_pattern_library(tables)
+    scores = evaluate_all_moves_batch(masks, tables, config)
+
+    entries = []
+    for row, mask in enumerate(masks):
+        pattern = library.lookup(mask)
+        if pattern is not None:
+            moves = [pattern['move']]
+        else:
+            free = [cell for cell in range(tables.board_size) if not mask >> cell & 1]
+            totals = scores['total'][row, free]
+            moves = [move for move, total in zip(free, totals) if total == totals.max()] if free else []
+        entries.append(tuple((move, {key: values[row, move].item() for key, values in scores.items()})
+                             for move in moves))
+    return entries
+
+
+class EvaluationService:
+    """Cached, micro-batched optimal-move queries for one scoring config
+
+    Call `start()` inside the event loop before `evaluate()`, and `close()`
+    when done. `workers=0` evaluates batches in a thread of this process.
+    """
+
+    def __init__(self, config: Optional[Dict] = None, workers: int = 4, max_batch: int = 64,
+                 max_wait_ms: float = 1.0, cache_size: int = 100_000):
+        self.config = config
+        resolved = resolve_config(config)
+        self.tables = get_tables(resolved['line_scores'], resolved['game_constraints'])
+        self.board_size = resolved['game_constraints']['board_size']
+        self.workers = workers
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.cache = TranspositionTable(cache_size)
+        self.requests = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.batched_boards = 0
+        self._executor = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._batcher: Optional[asyncio.Task] = None
+        self._running = set()
+
+    async def start(self) -> None:
+        if self.workers > 0:
+            self._executor = ProcessPoolExecutor(self.workers, initializer=init_worker, initargs=(self.config,))
+        else:
+            init_worker(self.config)
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(max(1, self.workers))
+        self._batcher = asyncio.create_task(self._batch_loop())
+
+    async def close(self) -> None:
+        if self._batcher is not None:
+            self._batcher.cancel()
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    async def evaluate(self, board_mask: int) -> Tuple[int, Optional[Dict[str, float]]]:
+        """(optimal move, its score dict) for a board mask, or (-1, None) on a full board"""
+        self.requests += 1
+        canonical_mask, index = canonical_form(board_mask, self.tables)
+        entry = self.cache.get(canonical_mask)
+        if entry is None:
+            future = self._pending.get(canonical_mask)
+            if future is None:
+                future = self._pending[canonical_mask] = asyncio.get_running_loop().create_future()
+                self._queue.put_nowait(canonical_mask)
+            else:
+                self.coalesced += 1
+            # Shielded so a client that disconnects does not cancel a future other requests share
+            entry = await asyncio.shield(future)
+        if not entry:
+            return -1, None
+        inverse = self.tables.inverse_perms[index]
+        return min(((inverse[move], score) for move, score in entry), key=lambda item: item[0])
+
+    async def _batch_loop(self) -> None:
+        while True:
+            await self._slots.acquire()
+            batch = [await self._queue.get()]
+            if self.max_wait > 0 and self._queue.qsize() < self.max_batch - 1:
+                await asyncio.sleep(self.max_wait)
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            task = asyncio.create_task(self._run_batch(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run_batch(self, batch: List[int]) -> None:
+        self.batches += 1
+        self.batched_boards += len(batch)
+        try:
+            entries = await asyncio.get_running_loop().run_in_executor(
+                self._executor, evaluate_boards, (batch, self.config))
+        except Exception as error:
+            for mask in batch:
+                self._pending.pop(mask).set_exception(error)
+            return
+        finally:
+            self._slots.release()
+        for mask, entry in zip(batch, entries):
+            self.cache.put(mask, entry)
+            self._pending.pop(mask).set_result(entry)
+
+    def stats(self) -> Dict:
+        return {
+            'requests': self.requests,
+            'cache': self.cache.stats(),
+            'coalesced': self.coalesced,
+            'batches': self.batches,
+            'batched_boards': self.batched_boards,
+            'mean_batch_size': self.batched_boards / self.batches if self.batches else 0.0
+        }
+
+    def parse_board(self, cells) -> int:
+        """Board mask of a list of cell indices; ValueError on anything else"""
+        if not isinstance(cells, list) or not all(isinstance(cell, int) and 0 <= cell < self.board_size
+                                                  for cell in cells):
+            raise ValueError(f"board must be a list of cell indices in [0, {self.board_size})")
+        return sum(1 << cell for cell in set(cells))
+
+
+async def _read_message(reader: asyncio.StreamReader) -> Optional[Tuple[str, Dict[str, str], bytes]]:
+    """(start line, lowercased headers, body) of one HTTP message, or None at end of stream"""
+    start_line = await reader.readline()
+    if not start_line:
+        return None
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get('content-length', 0)))
+    return start_line.decode('latin-1').strip(), headers, body
+
+
+def _write_json(writer: asyncio.StreamWriter, status: str, payload: Dict) -> None:
+    body = json.dumps(payload).encode()
+    writer.write(f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1') + body)
+
+
+async def _handle_request(service: EvaluationService, method: str, path: str, body: bytes) -> Tuple[str, Dict]:
+    if method == 'GET' and path == '/stats':
+        return '200 OK', service.stats()
+    if method != 'POST' or path != '/evaluate':
+        return '404 Not Found', {'error': f"unknown endpoint {method} {path}"}
+    try:
+        request = json.loads(body)
+        if 'boards' in request:
+            masks = [service.parse_board(cells) for cells in request['boards']]
+        else:
+            masks = [service.parse_board(request.get('board'))]
+    except (ValueError, AttributeError, TypeError) as error:
+        return '400 Bad Request', {'error': str(error)}
+    try:
+        evaluated = await asyncio.gather(*(service.evaluate(mask) for mask in masks))
+    except Exception as error:
+        # e.g. BrokenProcessPool: answer with an error rather than dropping the keep-alive connection
+        return '500 Internal Server Error', {'error': f"{type(error).__name__}: {error}"}
+    results = [{'move': move, 'score': score} for move, score in evaluated]
+    return '200 OK', {'results': results} if 'boards' in request else results[0]
+
+
+async def handle_connection(service: EvaluationService, reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter) -> None:
+    """Serve HTTP/1.1 requests on one keep-alive connection"""
+    try:
+        while True:
+            message = await _read_message(reader)
+            if message is None:
+                break
+            start_line, headers, body = message
+            method, path, _ = (start_line.split(' ') + ['', ''])[:3]
+            status, payload = await _handle_request(service, method, path, body)
+            _write_json(writer, status, payload)
+            await writer.drain()
+            if headers.get('connection', '').lower() == 'close':
+                break
+    except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host: str = '127.0.0.1', port: int = 8765, **service_options) -> None:
+    """Run the service until cancelled; `service_options` go to EvaluationService"""
+    service = EvaluationService(**service_options)
+    await service.start()
+    server = await asyncio.start_server(lambda reader, writer: handle_connection(service, reader, writer), host, port)
+    print(f"Evaluation service listening on http://{host}:{port}/evaluate")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+def random_requests(count: int, seed: int = 0, max_cells: int = 16, board_size: int = 25) -> List[List[int]]:
+    """Boards as a game would send them: 0 to max_cells - 1 random selected cells"""
+    rng = random.Random(seed)
+    return [rng.sample(range(board_size), rng.randint(0, max_cells - 1)) for _ in range(count)]
+
+
+async def _request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, method: str, path: str,
+                   payload: Optional[Dict] = None) -> Dict:
+    body = json.dumps(payload).encode() if payload is not None else b''
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1') + body)
+    await writer.drain()
+    message = await _read_message(reader)
+    if message is None:
+        raise ConnectionError("service closed the connection")
+    start_line, _, response = message
+    if ' 200 ' not in f"{start_line} ":
+        raise RuntimeError(f"{start_line}: {response.decode()}")
+    return json.loads(response)
+
+
+async def run_load(host: str = '127.0.0.1', port: int = 8765, clients: int = 32, requests: int = 5000,
+                   seed: int = 0) -> Dict:
+    """Send `requests` random boards over `clients` keep-alive connections
+
+    Returns requests/second, latency percentiles in milliseconds and the
+    service's /stats after the run.
+    """
+    boards = random_requests(requests, seed)
+    latencies = []
+
+    async def client(boards: List[List[int]]) -> None:
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for board in boards:
+                start = time.perf_counter()
+                await _request(reader, writer, 'POST', '/evaluate', {'board': board})
+                latencies.append(time.perf_counter() - start)
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(boards[index::clients]) for index in range(clients)))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        stats = await _request(reader, writer, 'GET', '/stats')
+    finally:
+        writer.close()
+    latencies_ms = np.array(latencies) * 1e3
+    return {
+        'requests': len(latencies),
+        'seconds': elapsed,
+        'requests_per_second': len(latencies) / elapsed,
+        'p50_ms': float(np.percentile(latencies_ms, 50)),
+        'p99_ms': float(np.percentile(latencies_ms, 99)),
+        'mean_ms': float(latencies_ms.mean()),
+        'service': stats
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Micro-batched move-evaluation service and load generator")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    serve_parser = subparsers.add_parser('serve', help="Run the evaluation service")
+    serve_parser.add_argument('--workers', type=int, default=4,
+                              help="Evaluation processes (0 evaluates in a thread of the server process)")
+    serve_parser.add_argument('--max-batch', type=int, default=64, help="Most boards scored per batch")
+    serve_parser.add_argument('--max-wait-ms', type=float, default=1.0,
+                              help="How long a batch waits for more boards before it is dispatched")
+    serve_parser.add_argument('--cache-size', type=int, default=100_000, help="Canonical boards kept in the cache")
+    load_parser = subparsers.add_parser('load', help="Measure latency and throughput of a running service")
+    load_parser.add_argument('--clients', type=int, default=32, help="Concurrent keep-alive connections")
+    load_parser.add_argument('--requests', type=int, default=5000)
+    load_parser.add_argument('--seed', type=int, default=0)
+    for sub in (serve_parser, load_parser):
+        sub.add_argument('--host', default='127.0.0.1')
+        sub.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        try:
+            asyncio.run(serve(args.host, args.port, workers=args.workers, max_batch=args.max_batch,
+                              max_wait_ms=args.max_wait_ms, cache_size=args.cache_size))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    report = asyncio.run(run_load(args.host, args.port, args.clients, args.requests, args.seed))
+    stats = report['service']
+    print(f"{report['requests']} requests over {args.clients} clients in {report['seconds']:.2f}s: "
+          f"{report['requests_per_second']:.0f} req/s")
+    print(f"Latency: p50 {report['p50_ms']:.2f} ms, p99 {report['p99_ms']:.2f} ms, mean {report['mean_ms']:.2f} ms")
+    cache = stats['cache']
+    lookups = cache['hits'] + cache['misses']
+    print(f"Service: cache hit rate {cache['hits'] / lookups if lookups else 0.0:.1%}, "
+          f"{stats['coalesced']} coalesced, {stats['batches']} batches "
+          f"(mean {stats['mean_batch_size']:.1f} boards)")
+
+
+if __name__ == "__main__":
+    main()
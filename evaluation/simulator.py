@@ -1,10 +1,19 @@
 import numpy as np
 from typing import List, Dict, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from tqdm import tqdm
-from solver import BingoSolver
+from solver import (BingoSolver, KNOWN_PATTERNS, build_tables, canonical_form, evaluate_all_moves_batch,
+                    get_tables, get_transposition_table)
+from opening_book import load_opening_book
+from exact_solver import load_exact_solver
+from aggregation import CACHE_KEYS, SCORE_KEYS, GameAggregator
+from game_log import GameLogWriter, iter_chunks, open_game_log
+import json
+import os
 import random
-from collections import Counter
+from collections import defaultdict
+from time import perf_counter_ns
+import profiling
 
 @dataclass
 class GameResult:
@@ -13,139 +22,740 @@ class GameResult:
     final_board: set
     scores: List[Dict[str, float]]
     pattern_matches: List[Dict]  # New field to track pattern matches
+    cache_stats: Dict[str, int] = field(default_factory=dict)  # Transposition table hits/misses/evictions during the game
 
-def run_game(_: int = 0) -> GameResult:
+class Opponent:
+    """Computer player: picks one free cell per turn
+
+    `choose` plays one game (drawing from the module-level `random` stream,
+    which run_game_chunk seeds per chunk); `choose_batch` picks for a whole
+    batch of boards at once from a numpy Generator, for play_batch. `game` is
+    the game's index in the run and `turn` the computer's turn (0-7).
+    """
+
+    def choose(self, board_mask: int, game: int, turn: int) -> int:
+        raise NotImplementedError
+
+    def choose_batch(self, boards: np.ndarray, games: np.ndarray, turn: int, rng: np.random.Generator) -> np.ndarray:
+        raise NotImplementedError
+
+    def __repr__(self) -> str:
+        params = ', '.join(f'{key}={value!r}' for key, value in vars(self).items() if not key.startswith('_'))
+        return f'{type(self).__name__}({params})'
+
+
+def _nth_free_cell(board_mask: int, index: int) -> int:
+    """Cell of the `index`-th (0-based) unselected bit of a board"""
+    free = ~board_mask & ((1 << 25) - 1)
+    for _ in range(index):
+        free &= free - 1
+    return (free & -free).bit_length() - 1
+
+
+class UniformOpponent(Opponent):
+    """Uniformly random free cell (the original computer player)"""
+
+    def choose(self, board_mask: int, game: int, turn: int) -> int:
+        # randrange(n) draws like random.choice over an n-element list of free cells
+        return _nth_free_cell(board_mask, random.randrange(25 - board_mask.bit_count()))
+
+    def choose_batch(self, boards: np.ndarray, games: np.ndarray, turn: int, rng: np.random.Generator) -> np.ndarray:
+        free = (boards[:, None] & _CELL_BITS) == 0
+        picks = np.floor(rng.random(len(boards)) * free.sum(axis=1)).astype(np.int64)
+        return np.argmax(free.cumsum(axis=1) > picks[:, None], axis=1)
+
+
+class BlockerOpponent(Opponent):
+    """Starves the solver's densest lines
+
+    Selected cells count for every line through them, so the computer cannot
+    take cells away from the solver; the most obstructive it can do is play
+    where it helps least. It picks the free cell whose fullest line has the
+    fewest selected cells, then the fewest selected cells over all its lines,
+    breaking remaining ties uniformly at random.
+    """
+
+    def choose(self, board_mask: int, game: int, turn: int) -> int:
+        tables = get_tables()
+        line_counts = [(line_mask & board_mask).bit_count() for line_mask in tables.line_masks]
+        best_key, best_cells = None, []
+        for cell in range(25):
+            if board_mask >> cell & 1:
+                continue
+            counts = [line_counts[line] for line in tables.cell_lines[cell]]
+            key = (max(counts), sum(counts))
+            if best_key is None or key < best_key:
+                best_key, best_cells = key, [cell]
+            elif key == best_key:
+                best_cells.append(cell)
+        return best_cells[random.randrange(len(best_cells))]
+
+    def choose_batch(self, boards: np.ndarray, games: np.ndarray, turn: int, rng: np.random.Generator) -> np.ndarray:
+        incidence = get_tables().line_incidence.astype(np.int64)
+        occupied = (boards[:, None] & _CELL_BITS) != 0
+        line_counts = occupied.astype(np.int64) @ incidence.T
+        densest = (line_counts[:, :, None] * incidence[None]).max(axis=1)
+        key = densest * 64 + line_counts @ incidence
+        # Integer keys, so noise below 1 only breaks ties
+        key = key + rng.random(key.shape) * 0.5
+        return np.argmin(np.where(occupied, np.inf, key), axis=1)
+
+
+class CenterBiasedOpponent(Opponent):
+    """Free cell drawn with weight exp(-strength * distance to the center cell)"""
+
+    def __init__(self, strength: float = 1.0):
+        self.strength = strength
+        rows, columns = np.divmod(np.arange(25), 5)
+        self._weights = np.exp(-strength * np.hypot(rows - 2, columns - 2))
+
+    def choose(self, board_mask: int, game: int, turn: int) -> int:
+        free = [cell for cell in range(25) if not board_mask >> cell & 1]
+        threshold = random.random() * sum(self._weights[cell] for cell in free)
+        for cell in free:
+            threshold -= self._weights[cell]
+            if threshold < 0:
+                return cell
+        return free[-1]
+
+    def choose_batch(self, boards: np.ndarray, games: np.ndarray, turn: int, rng: np.random.Generator) -> np.ndarray:
+        weights = np.where((boards[:, None] & _CELL_BITS) == 0, self._weights, 0.0)
+        cumulative = weights.cumsum(axis=1)
+        thresholds = rng.random(len(boards)) * cumulative[:, -1]
+        return np.minimum(np.argmax(cumulative > thresholds[:, None], axis=1), 24)
+
+
+class ReplayOpponent(Opponent):
+    """Replays the computer moves of a game log (see game_log.py)
+
+    Game `game` replays logged game ``game % len(log)``; a logged move whose
+    cell is already taken (the solver played differently) falls back to a
+    uniformly random free cell.
+    """
+
+    def __init__(self, log_path: str):
+        self.log_path = log_path
+        self._moves = None
+        self._fallback = UniformOpponent()
+
+    @property
+    def moves(self) -> np.ndarray:
+        if self._moves is None:
+            self._moves = open_game_log(self.log_path)['moves'][:, 1::2]
+        return self._moves
+
+    def __getstate__(self) -> Dict:
+        # Workers reopen the memory map
+        return {**self.__dict__, '_moves': None}
+
+    def choose(self, board_mask: int, game: int, turn: int) -> int:
+        move = int(self.moves[game % len(self.moves), turn])
+        if board_mask >> move & 1:
+            return self._fallback.choose(board_mask, game, turn)
+        return move
+
+    def choose_batch(self, boards: np.ndarray, games: np.ndarray, turn: int, rng: np.random.Generator) -> np.ndarray:
+        moves = self.moves[games % len(self.moves), turn].astype(np.int64)
+        taken = (boards & _CELL_BITS[moves]) != 0
+        if taken.any():
+            moves[taken] = self._fallback.choose_batch(boards[taken], games[taken], turn, rng)
+        return moves
+
+
+OPPONENTS = {
+    'uniform': UniformOpponent,
+    'blocker': BlockerOpponent,
+    'center': CenterBiasedOpponent,
+    'replay': ReplayOpponent
+}
+
+_CELL_BITS = np.int64(1) << np.arange(25, dtype=np.int64)
+
+
+def run_game(game_index: int = 0, use_cache: bool = False, opening_book_path: str = None, engine: str = 'set',
+             exact_table_path: str = None, config: Dict = None, opponent: Opponent = None,
+             epsilon: float = 0.0) -> GameResult:
     """Function to run a single game for multiprocessing
     
     Args:
-        _: Unused argument required for multiprocessing
+        game_index: Index of the game in the run (used by opponents such as ReplayOpponent)
+        use_cache: Look up solver decisions in the process-wide transposition table
+        opening_book_path: Opening book file consulted before searching (ignored if stale)
+        engine: Solver engine; a single solver is kept for the whole game and updated
+            cell by cell, which the 'incremental' engine exploits
+        exact_table_path: Exact expectimax table (see exact_solver.py); when given, the
+            player plays its expectation-maximizing moves and scores record their heuristic value
+        config: Scoring config overrides passed to BingoSolver (see solver.resolve_config)
+        opponent: Computer player (default: UniformOpponent)
+        epsilon: Probability that the player plays a uniformly random free cell instead of
+            the solver's move, to log alternative moves for pattern mining (see pattern_library.py)
     """
+    profile = profiling.ACTIVE
+    if profile is not None:
+        game_start = perf_counter_ns()
+    opponent = UniformOpponent() if opponent is None else opponent
+    opening_book = load_opening_book(opening_book_path) if opening_book_path else None
+    exact_solver = load_exact_solver(exact_table_path) if exact_table_path else None
+    cache_before = get_transposition_table(config).stats() if use_cache else None
     board_state = set()
     moves = []
     scores = []
     pattern_matches = []  # Track pattern matches during the game
+    solver = BingoSolver(board_state, engine=engine, use_cache=use_cache, opening_book=opening_book, config=config)
     
     while len(board_state) < 16:
-        # Player's move using the solver
-        solver = BingoSolver(board_state)
-        
-        # Check for pattern match before getting move
+        # Player's move using the solver, checking for a pattern match first
         pattern_match = solver._check_patterns()
-        if pattern_match:
-            pattern_matches.append(pattern_match)
         
-        move, score = solver.get_optimal_move()
+        if exact_solver is not None:
+            move = exact_solver.get_optimal_move(board_state)[0]
+            score = solver.evaluate_move(move)
+        else:
+            move, score = solver.get_optimal_move()
+        if epsilon and random.random() < epsilon:
+            move = _nth_free_cell(solver.board_mask, random.randrange(25 - solver.board_mask.bit_count()))
+            score = solver.evaluate_move(move)
+        # Only record the match when its move was played (the exact table may choose another)
+        if pattern_match and pattern_match['move'] == move:
+            pattern_matches.append(pattern_match)
         
-        board_state.add(move)
+        solver.add_cell(move)
         moves.append(move)
         scores.append(score)
         
-        # Computer's random move
+        # Computer's move
         if len(board_state) < 16:
-            # Get all possible moves
-            possible_moves = [i for i in range(25) if i not in board_state]
-            # Make a random move
-            computer_move = random.choice(possible_moves)
-            board_state.add(computer_move)
+            if profile is not None:
+                start = perf_counter_ns()
+            computer_move = opponent.choose(solver.board_mask, game_index, len(moves) // 2)
+            if profile is not None:
+                profile.record('opponent_move', start)
+            solver.add_cell(computer_move)
             moves.append(computer_move)
             # Add a dummy score for computer moves
             scores.append({'three_line': 0, 'four_line': 0, 'five_line': 0, 'total': 0})
     
-    solver = BingoSolver(board_state)
     completed_lines = solver.count_completed_lines()
+
+    cache_stats = {}
+    if use_cache:
+        cache_after = get_transposition_table(config).stats()
+        cache_stats = {key: cache_after[key] - cache_before[key] for key in ('hits', 'misses', 'evictions')}
+    if profile is not None:
+        profile.record('run_game', game_start)
     
     return GameResult(
         completed_lines=completed_lines,
         moves=moves,
         final_board=board_state,
         scores=scores,
-        pattern_matches=pattern_matches
+        pattern_matches=pattern_matches,
+        cache_stats=cache_stats
     )
 
+def pack_results(results: List[GameResult]) -> Dict[str, np.ndarray]:
+    """Pack GameResults into fixed-width arrays (the play_batch layout plus cache counters)"""
+    descriptions = [pattern['description'] for pattern in KNOWN_PATTERNS]
+    num_games = len(results)
+    arrays = {
+        'moves': np.zeros((num_games, 16), dtype=np.uint8),
+        'final_boards': np.zeros(num_games, dtype=np.uint32),
+        'completed_lines': np.zeros(num_games, dtype=np.uint8),
+        'scores': np.zeros((num_games, 8, len(SCORE_KEYS))),
+        'pattern_indices': np.full((num_games, 8), -1, dtype=np.int8),
+        'cache_stats': np.zeros((num_games, len(CACHE_KEYS)), dtype=np.int64)
+    }
+    for game, result in enumerate(results):
+        arrays['moves'][game] = result.moves
+        arrays['final_boards'][game] = sum(1 << cell for cell in result.final_board)
+        arrays['completed_lines'][game] = result.completed_lines
+        arrays['scores'][game] = [[score[key] for key in SCORE_KEYS] for score in result.scores[::2]]
+        # Every cell is played once per game, so a matched move identifies its turn
+        for match in result.pattern_matches:
+            turn = result.moves.index(match['move']) // 2
+            arrays['pattern_indices'][game, turn] = descriptions.index(match['description'])
+        arrays['cache_stats'][game] = [result.cache_stats.get(key, 0) for key in CACHE_KEYS]
+    return arrays
+
+
+def unpack_results(arrays: Dict[str, np.ndarray]) -> List[GameResult]:
+    """Rebuild GameResults from packed arrays"""
+    results = []
+    dummy_score = {'three_line': 0, 'four_line': 0, 'five_line': 0, 'total': 0}
+    for game in range(len(arrays['completed_lines'])):
+        moves = arrays['moves'][game].tolist()
+        scores = []
+        for turn_scores in arrays['scores'][game].tolist():
+            scores.append(dict(zip(SCORE_KEYS, turn_scores)))
+            scores.append(dict(dummy_score))
+        pattern_matches = [
+            {'move': moves[2 * turn], 'description': KNOWN_PATTERNS[index]['description']}
+            for turn, index in enumerate(arrays['pattern_indices'][game].tolist()) if index >= 0
+        ]
+        mask = int(arrays['final_boards'][game])
+        cache_stats = arrays['cache_stats'][game].tolist() if 'cache_stats' in arrays else [0] * len(CACHE_KEYS)
+        results.append(GameResult(
+            completed_lines=int(arrays['completed_lines'][game]),
+            moves=moves,
+            final_board={cell for cell in range(25) if mask >> cell & 1},
+            scores=scores[:len(moves)],
+            pattern_matches=pattern_matches,
+            cache_stats=dict(zip(CACHE_KEYS, cache_stats))
+        ))
+    return results
+
+
+def init_worker(profile: bool = False) -> None:
+    """Pool initializer: build the solver tables and optionally turn on phase profiling"""
+    build_tables()
+    if profile:
+        profiling.enable()
+
+
+def run_game_chunk(task: Tuple[int, int, int, str, Dict, bool]) -> Tuple[GameAggregator, Dict[str, np.ndarray]]:
+    """Play one chunk of games in a worker and return its aggregate (and packed games)
+
+    Args:
+        task: (chunk index, index of the chunk's first game, number of games, base seed,
+            run_game keyword arguments, whether to return the packed games). The worker's
+            `random` state is seeded from (base seed, chunk index), so a chunk's games do
+            not depend on which worker plays it.
+
+    If profiling is on in the worker (see init_worker), the chunk's phase
+    timings are returned in the aggregator's `profile`.
+    """
+    chunk_index, start, num_games, seed, game_options, keep_results = task
+    random.seed(f"{seed}-{chunk_index}")
+    aggregator = GameAggregator()
+    if profiling.ACTIVE is not None:
+        aggregator.profile = profiling.enable()
+    results = []
+    for game_index in range(start, start + num_games):
+        result = run_game(game_index, **game_options)
+        aggregator.update(result)
+        if keep_results:
+            results.append(result)
+    return aggregator, pack_results(results) if keep_results else None
+
+
 class BingoSimulator:
-    def __init__(self, num_games: int = 5000):
+    def __init__(self, num_games: int = 5000, use_cache: bool = False, opening_book_path: str = None,
+                 engine: str = 'set', exact_table_path: str = None, seed: int = None,
+                 keep_results: bool = True, game_log_path: str = None, opponent: Opponent = None,
+                 profile: bool = False, epsilon: float = 0.0):
         self.num_games = num_games
-        self.results: List[GameResult] = []
+        self.engine = engine
+        self.exact_table_path = exact_table_path
+        self.use_cache = use_cache
+        self.opening_book_path = opening_book_path
+        self.seed = seed
+        # With keep_results=False only the running aggregate is kept (memory independent of num_games)
+        self.keep_results = keep_results
+        # Optional columnar log directory that every played game is appended to (see game_log.py)
+        self.game_log_path = game_log_path
+        self.opponent = UniformOpponent() if opponent is None else opponent
+        # Rate of random player moves (see run_game), for logs that pattern mining can learn from
+        self.epsilon = epsilon
+        # Record per-phase solver timings in the workers (see profiling.py and analyze_profile)
+        self.profile = profile
+        self.aggregator = GameAggregator()
+        # Packed per-game results (see pack_results); GameResults are rebuilt on demand
+        self.arrays: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def from_game_log(cls, path: str) -> 'BingoSimulator':
+        """Simulator whose analysis methods run over a memory-mapped game log"""
+        simulator = cls()
+        simulator.arrays = open_game_log(path)
+        simulator.num_games = len(simulator.arrays['completed_lines'])
+        for chunk in iter_chunks(simulator.arrays):
+            simulator.aggregator.update_arrays(chunk)
+        return simulator
+
+    @property
+    def results(self) -> List[GameResult]:
+        return unpack_results(self.arrays) if self.arrays else []
+
+    @results.setter
+    def results(self, results: List[GameResult]) -> None:
+        self.arrays = pack_results(results)
+        self.aggregator = GameAggregator.from_arrays(self.arrays)
         
     def run_single_game(self) -> GameResult:
-        return run_game()
+        return run_game(**self._game_options())
+
+    def _game_options(self) -> Dict:
+        options = {
+            'use_cache': self.use_cache,
+            'opening_book_path': self.opening_book_path,
+            'engine': self.engine,
+            'exact_table_path': self.exact_table_path,
+            'opponent': self.opponent
+        }
+        # Only when set, so checkpoints written before epsilon existed still resume
+        if self.epsilon:
+            options['epsilon'] = self.epsilon
+        return options
+
+    def _checkpoint_options(self) -> Dict:
+        """JSON-serializable _game_options() for checkpoints"""
+        return {**self._game_options(), 'opponent': repr(self.opponent)}
     
-    def run_simulation(self, num_workers: int = 4) -> None:
-        """Run multiple games in parallel using multiprocessing"""
+    def _load_checkpoint(self, checkpoint_path: str, chunk_size: int) -> Tuple[int, int, GameAggregator]:
+        """Seed, next chunk index and aggregate of a compatible checkpoint (or a fresh start)"""
+        if not os.path.exists(checkpoint_path):
+            seed = self.seed if self.seed is not None else random.randrange(2 ** 32)
+            return seed, 0, GameAggregator()
+
+        with open(checkpoint_path) as f:
+            checkpoint = json.load(f)
+        aggregator = GameAggregator.from_dict(checkpoint['aggregator'])
+        if checkpoint['chunk_size'] != chunk_size or checkpoint['game_options'] != self._checkpoint_options():
+            raise ValueError(f"Checkpoint {checkpoint_path} was written with different simulation settings")
+        if self.seed is not None and checkpoint['seed'] != self.seed:
+            raise ValueError(f"Checkpoint {checkpoint_path} was written with seed {checkpoint['seed']}, not {self.seed}")
+        if len(aggregator) > self.num_games or (len(aggregator) % chunk_size and len(aggregator) != self.num_games):
+            raise ValueError(f"Checkpoint {checkpoint_path} holds {len(aggregator)} games, "
+                             f"which cannot be continued to {self.num_games}")
+        return checkpoint['seed'], checkpoint['next_chunk'], aggregator
+
+    def _save_checkpoint(self, checkpoint_path: str, chunk_size: int, seed: int, next_chunk: int) -> None:
+        """Atomically write the merged aggregate and the position in the chunk sequence"""
+        checkpoint = {
+            'seed': seed,
+            'chunk_size': chunk_size,
+            'next_chunk': next_chunk,
+            'game_options': self._checkpoint_options(),
+            'aggregator': self.aggregator.to_dict()
+        }
+        temp_path = f'{checkpoint_path}.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(checkpoint, f)
+        os.replace(temp_path, checkpoint_path)
+
+    def run_simulation(self, num_workers: int = 4, chunk_size: int = 100, checkpoint_path: str = None,
+                       checkpoint_every: int = 10) -> None:
+        """Run multiple games in parallel using multiprocessing
+
+        Workers play `chunk_size` games per task and send back the chunk's
+        GameAggregator (plus the games packed into arrays if keep_results),
+        so there is one round trip per chunk instead of one pickled
+        GameResult per game.
+
+        With `checkpoint_path`, the merged aggregate and the next chunk index
+        are written there every `checkpoint_every` chunks and at the end, and
+        an existing checkpoint is continued from. Chunks are seeded from
+        (seed, chunk index) and merged in order, so a resumed run reproduces
+        the statistics of an uninterrupted one (transposition-table counters
+        aside, as worker caches start empty). Per-game arrays only cover the
+        games played by this call; the game log is truncated back to the
+        checkpoint and appended to.
+        """
         from multiprocessing import Pool
+
+        if checkpoint_path:
+            seed, first_chunk, self.aggregator = self._load_checkpoint(checkpoint_path, chunk_size)
+        else:
+            seed = self.seed if self.seed is not None else random.randrange(2 ** 32)
+            first_chunk, self.aggregator = 0, GameAggregator()
+        self.seed = seed
+        tasks = [
+            (chunk_index, start, min(chunk_size, self.num_games - start), seed, self._game_options(),
+             self.keep_results or self.game_log_path is not None)
+            for chunk_index, start in enumerate(range(0, self.num_games, chunk_size))
+        ][first_chunk:]
         
-        with Pool(num_workers) as pool:
-            self.results = list(tqdm(
-                pool.imap(run_game, range(self.num_games)),
-                total=self.num_games,
-                desc="Running simulations"
-            ))
+        # Build the shared solver tables once per worker, before the first game
+        chunks = []
+        game_log = GameLogWriter(self.game_log_path, start=len(self.aggregator)) if self.game_log_path else None
+        with Pool(num_workers, initializer=init_worker, initargs=(self.profile,)) as pool, \
+                tqdm(total=self.num_games, initial=len(self.aggregator), desc="Running simulations") as progress:
+            for chunk_index, (aggregator, chunk) in enumerate(pool.imap(run_game_chunk, tasks), first_chunk + 1):
+                self.aggregator.merge(aggregator)
+                if game_log is not None:
+                    game_log.append(chunk)
+                if self.keep_results:
+                    chunks.append(chunk)
+                if checkpoint_path and chunk_index % checkpoint_every == 0:
+                    self._save_checkpoint(checkpoint_path, chunk_size, seed, chunk_index)
+                progress.update(len(aggregator))
+        if game_log is not None:
+            game_log.close()
+        if checkpoint_path:
+            self._save_checkpoint(checkpoint_path, chunk_size, seed, first_chunk + len(tasks))
+        self.arrays = {key: np.concatenate([chunk[key] for chunk in chunks]) for key in chunks[0]} if chunks else {}
     
-    def get_statistics(self) -> Dict:
-        """Calculate statistics from the simulation results"""
-        completed_lines = [r.completed_lines for r in self.results]
-        
-        # Convert numpy types to Python native types
+    def run_adaptive(self, target_half_width: float = 0.01, distribution_half_width: float = None,
+                     confidence: float = 0.95, max_games: int = 1_000_000, min_games: int = 1000,
+                     num_workers: int = 4, chunk_size: int = 100) -> Dict:
+        """Play chunks until the confidence interval on mean_lines is narrow enough
+
+        Chunks are dispatched to the pool with a bounded number in flight and
+        merged in chunk order; after each merge the run stops once at least
+        `min_games` were played and the interval half-width on mean completed
+        lines is at most `target_half_width` (and, if given, every
+        line_distribution bucket's probability is within
+        `distribution_half_width`), or when `max_games` is reached. Chunks are
+        seeded like run_simulation's, so the stopping point is reproducible
+        for a given seed.
+
+        Returns the number of games played and the achieved precision.
+        """
+        from collections import deque
+        from multiprocessing import Pool
+
+        seed = self.seed if self.seed is not None else random.randrange(2 ** 32)
+        self.seed = seed
+        keep_arrays = self.keep_results or self.game_log_path is not None
+
+        def target_met() -> bool:
+            if len(self.aggregator) < min_games:
+                return False
+            if self.aggregator.mean_half_width(confidence) > target_half_width:
+                return False
+            return distribution_half_width is None or \
+                max(self.aggregator.distribution_half_widths(confidence).values()) <= distribution_half_width
+
+        self.aggregator = GameAggregator()
+        chunks = []
+        game_log = GameLogWriter(self.game_log_path) if self.game_log_path else None
+        with Pool(num_workers, initializer=init_worker, initargs=(self.profile,)) as pool, \
+                tqdm(total=max_games, desc="Running simulations") as progress:
+            pending = deque()
+            next_chunk = 0
+            while True:
+                # Keep every worker busy without queueing far past the stopping point
+                while len(pending) < 2 * num_workers and next_chunk * chunk_size < max_games:
+                    count = min(chunk_size, max_games - next_chunk * chunk_size)
+                    task = (next_chunk, next_chunk * chunk_size, count, seed, self._game_options(), keep_arrays)
+                    pending.append(pool.apply_async(run_game_chunk, (task,)))
+                    next_chunk += 1
+                if not pending:
+                    break
+                aggregator, chunk = pending.popleft().get()
+                self.aggregator.merge(aggregator)
+                if game_log is not None:
+                    game_log.append(chunk)
+                if self.keep_results:
+                    chunks.append(chunk)
+                progress.update(len(aggregator))
+                if target_met():
+                    break
+        if game_log is not None:
+            game_log.close()
+        self.arrays = {key: np.concatenate([chunk[key] for chunk in chunks]) for key in chunks[0]} if chunks else {}
+        self.num_games = len(self.aggregator)
+
+        distribution_widths = self.aggregator.distribution_half_widths(confidence)
         return {
-            'mean_lines': float(np.mean(completed_lines)),
-            'std_lines': float(np.std(completed_lines)),
-            'min_lines': int(np.min(completed_lines)),
-            'max_lines': int(np.max(completed_lines)),
-            'line_distribution': {
-                str(i): int(sum(1 for r in completed_lines if r == i))
-                for i in range(14)  # Maximum possible lines is 13
-            },
-            'total_games': len(self.results)
+            'games': len(self.aggregator),
+            'target_met': target_met(),
+            'confidence': confidence,
+            'mean_lines': self.aggregator.mean,
+            'mean_half_width': self.aggregator.mean_half_width(confidence),
+            'max_distribution_half_width': max(distribution_widths.values()),
+            'distribution_half_widths': distribution_widths
         }
+
+    def compute_exact_distribution(self, engine: str = 'vectorized', merge_symmetric: bool = False) -> Dict:
+        """Exact counterpart of get_statistics() for the solver against the random opponent
+
+        Instead of sampling games, probability mass is propagated layer by
+        layer over every reachable board: the solver's move is deterministic
+        and each computer reply has probability 1 / (free cells). Solver
+        decisions go through the symmetry-canonical transposition table, so
+        each equivalence class of boards is evaluated once.
+
+        Args:
+            engine: Solver engine used for the decisions (all engines agree)
+            merge_symmetric: Also merge the mass of symmetric boards. This shrinks the
+                state space further but is only exact when the solver's choice is
+                symmetry-equivariant; ties are broken by lowest cell index, so the
+                result can differ from run_game in the last decimals.
+        """
+        if type(self.opponent) is not UniformOpponent:
+            raise ValueError("compute_exact_distribution() assumes the uniformly random opponent")
+        if self.epsilon:
+            raise ValueError("compute_exact_distribution() assumes the deterministic player (epsilon=0)")
+        opening_book = load_opening_book(self.opening_book_path) if self.opening_book_path else None
+        exact_solver = load_exact_solver(self.exact_table_path) if self.exact_table_path else None
+
+        layer = {0: 1.0}
+        while True:
+            size = next(iter(layer)).bit_count()
+            if size >= 16:
+                break
+            next_layer = defaultdict(float)
+            for mask, probability in layer.items():
+                board_state = {cell for cell in range(25) if mask >> cell & 1}
+                if exact_solver is not None:
+                    move = exact_solver.get_optimal_move(board_state)[0]
+                else:
+                    solver = BingoSolver(board_state, engine=engine, use_cache=True, opening_book=opening_book)
+                    move = solver.get_optimal_move()[0]
+                mask |= 1 << move
+                if size + 1 >= 16:
+                    next_layer[mask] += probability
+                    continue
+                replies = [cell for cell in range(25) if not mask >> cell & 1]
+                share = probability / len(replies)
+                for reply in replies:
+                    child = mask | 1 << reply
+                    if merge_symmetric:
+                        child = canonical_form(child)[0]
+                    next_layer[child] += share
+            layer = next_layer
+
+        line_masks = BingoSolver(set()).line_masks
+        probabilities = defaultdict(float)
+        for mask, probability in layer.items():
+            probabilities[sum(1 for line_mask in line_masks if mask & line_mask == line_mask)] += probability
+
+        mean = sum(lines * p for lines, p in probabilities.items())
+        variance = sum((lines - mean) ** 2 * p for lines, p in probabilities.items())
+        possible = [lines for lines, p in probabilities.items() if p > 0]
+        return {
+            'mean_lines': mean,
+            'std_lines': variance ** 0.5,
+            'min_lines': min(possible),
+            'max_lines': max(possible),
+            # Expected counts over a run of num_games games
+            'line_distribution': {str(i): probabilities[i] * self.num_games for i in range(14)},
+            'line_probabilities': {str(i): probabilities[i] for i in range(14)},
+            'total_games': self.num_games
+        }
+
+    def get_statistics(self) -> Dict:
+        """Calculate statistics from the simulation results"""
+        return self.aggregator.get_statistics()
     
     def analyze_move_patterns(self) -> Dict:
         """Analyze patterns in the moves made during games"""
-        all_moves = [move for result in self.results for move in result.moves]
-        move_frequencies = {}
-        
-        for i in range(25):
-            # Convert to float for JSON serialization
-            move_frequencies[str(i)] = float(all_moves.count(i) / len(self.results))
-        
-        return move_frequencies
+        return self.aggregator.analyze_move_patterns()
     
     def analyze_score_patterns(self) -> Dict:
         """Analyze patterns in the scores during games"""
-        # Only consider player moves (every other move)
-        all_scores = [score for result in self.results for score in result.scores[::2]]
-        
-        # Convert numpy types to Python native types
-        return {
-            'mean_three_line': float(np.mean([s['three_line'] for s in all_scores])),
-            'mean_four_line': float(np.mean([s['four_line'] for s in all_scores])),
-            'mean_five_line': float(np.mean([s['five_line'] for s in all_scores])),
-            'mean_total': float(np.mean([s['total'] for s in all_scores]))
-        }
+        return self.aggregator.analyze_score_patterns()
     
     def analyze_pattern_recognition(self) -> Dict:
         """Analyze pattern recognition statistics across all games."""
-        total_matches = 0
-        pattern_descriptions = []
-        
-        # Collect pattern matches from all games
-        for result in self.results:
-            total_matches += len(result.pattern_matches)
-            pattern_descriptions.extend(match['description'] for match in result.pattern_matches)
-        
-        # Calculate pattern match rate
-        total_moves = sum(len(result.moves) // 2 for result in self.results)  # Only count player moves
-        match_rate = (total_matches / total_moves) * 100 if total_moves > 0 else 0
-        
-        # Find most common pattern
-        pattern_counter = Counter(pattern_descriptions)
-        most_common = pattern_counter.most_common(1)[0] if pattern_descriptions else ("None", 0)
-        
-        return {
-            'total_matches': total_matches,
-            'match_rate': match_rate,
-            'most_common_pattern': {
-                'description': most_common[0],
-                'count': most_common[1]
-            },
-            'pattern_counts': dict(pattern_counter)
-        } 
\ No newline at end of file
+        return self.aggregator.analyze_pattern_recognition()
+
+    def analyze_cache(self) -> Dict:
+        """Aggregate transposition table counters across all games (and workers)."""
+        return self.aggregator.analyze_cache()
+
+    def analyze_profile(self) -> Dict:
+        """Per-phase call counts and timings across all workers (empty unless profile=True)."""
+        return self.aggregator.profile.report()
+
+
+def _pattern_lookup() -> Dict[int, Tuple[int, int]]:
+    """Board mask -> (pattern move, pattern index) for every transformed known pattern
+
+    Mirrors BingoSolver._check_patterns: earlier patterns and earlier
+    transformations win.
+    """
+    lookup = {}
+    for index, pattern in enumerate(KNOWN_PATTERNS):
+        if len(pattern['cells']) != pattern['move_count']:
+            continue
+        for perm in get_tables().transformation_perms:
+            mask = 0
+            for cell in pattern['cells']:
+                mask |= 1 << perm[cell]
+            lookup.setdefault(mask, (perm[pattern['optimal_move']], index))
+    return lookup
+
+
+def play_batch(num_games: int, rng: np.random.Generator, config: Dict = None, opponent: Opponent = None,
+               first_game: int = 0) -> Dict[str, np.ndarray]:
+    """Play `num_games` games in lockstep on NumPy arrays
+
+    Boards are int64 bitmasks; every turn the solver's moves for the whole
+    batch come from one evaluate_all_moves_batch call (scored with `config`,
+    see solver.resolve_config) and the computer's replies for the whole batch
+    from one `opponent.choose_batch` call (default: UniformOpponent) drawing
+    from `rng`. The games are numbered from `first_game`.
+
+    Returns:
+        moves: (num_games, 16) uint8 move sequences, player moves at even positions
+        final_boards: (num_games,) uint32 board masks
+        completed_lines: (num_games,) uint8
+        scores: (num_games, 8, 4) player move scores in SCORE_KEYS order
+        pattern_indices: (num_games, 8) int8 index into KNOWN_PATTERNS, -1 if none matched
+    """
+    board_size = 25
+    player_turns = 8
+    opponent = UniformOpponent() if opponent is None else opponent
+    patterns = _pattern_lookup()
+    pattern_masks = np.array(list(patterns), dtype=np.int64)
+    cell_bits = np.int64(1) << np.arange(board_size, dtype=np.int64)
+
+    boards = np.zeros(num_games, dtype=np.int64)
+    moves = np.zeros((num_games, 2 * player_turns), dtype=np.uint8)
+    scores = np.zeros((num_games, player_turns, len(SCORE_KEYS)))
+    pattern_indices = np.full((num_games, player_turns), -1, dtype=np.int8)
+    games = np.arange(num_games)
+
+    for turn in range(player_turns):
+        # Player's move: best total among free cells, first maximum on ties
+        move_scores = evaluate_all_moves_batch(boards, config=config)
+        occupied = (boards[:, None] & cell_bits) != 0
+        player_moves = np.argmax(np.where(occupied, -np.inf, move_scores['total']), axis=1)
+
+        for game in np.flatnonzero(np.isin(boards, pattern_masks)):
+            player_moves[game], pattern_indices[game, turn] = patterns[int(boards[game])]
+
+        for key_index, key in enumerate(SCORE_KEYS):
+            scores[:, turn, key_index] = move_scores[key][games, player_moves]
+        boards |= cell_bits[player_moves]
+        moves[:, 2 * turn] = player_moves
+
+        # Computer's move
+        computer_moves = opponent.choose_batch(boards, games + first_game, turn, rng)
+        boards |= cell_bits[computer_moves]
+        moves[:, 2 * turn + 1] = computer_moves
+
+    line_masks = np.array(get_tables().line_masks, dtype=np.int64)
+    completed_lines = ((boards[:, None] & line_masks) == line_masks).sum(axis=1)
+
+    return {
+        'moves': moves,
+        'final_boards': boards.astype(np.uint32),
+        'completed_lines': completed_lines.astype(np.uint8),
+        'scores': scores,
+        'pattern_indices': pattern_indices
+    }
+
+
+class BatchedSimulator(BingoSimulator):
+    """BingoSimulator that plays games in lockstep batches instead of one by one
+
+    Batches are produced in the packed array layout BingoSimulator analyzes,
+    so all analysis methods are shared.
+    """
+
+    def __init__(self, num_games: int = 5000, seed: int = None, batch_size: int = 256, keep_results: bool = True,
+                 game_log_path: str = None, opponent: Opponent = None):
+        super().__init__(num_games, seed=seed, keep_results=keep_results, game_log_path=game_log_path,
+                         opponent=opponent)
+        self.batch_size = batch_size
+
+    def run_simulation(self, num_workers: int = 1) -> None:
+        """Play all games in the current process; `num_workers` is accepted for interface compatibility"""
+        rng = np.random.default_rng(self.seed)
+        self.aggregator = GameAggregator()
+        batches = []
+        game_log = GameLogWriter(self.game_log_path) if self.game_log_path else None
+        for start in tqdm(range(0, self.num_games, self.batch_size), desc="Running simulations"):
+            batch = play_batch(min(self.batch_size, self.num_games - start), rng, opponent=self.opponent,
+                               first_game=start)
+            self.aggregator.update_arrays(batch)
+            if game_log is not None:
+                game_log.append(batch)
+            if self.keep_results:
+                batches.append(batch)
+        if game_log is not None:
+            game_log.close()
+        self.arrays = {key: np.concatenate([batch[key] for batch in batches]) for key in batches[0]} if batches else {}
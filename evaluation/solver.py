@@ -1,144 +1,915 @@
+import hashlib
 import numpy as np
+from collections import OrderedDict
+from math import isqrt
+from time import perf_counter_ns
 from typing import Set, List, Dict, Tuple, Optional
+import profiling
 from scoring_config import LINE_SCORES, IMMEDIATE_BONUSES, MOVE_WEIGHTS, GAME_CONSTRAINTS, NEW_SCORING
 
-class BingoSolver:
-    def __init__(self, board_state: Set[int]):
-        self.board_state = board_state
-        self.line_definitions = {
-            # Rows (0-4)
-            0: [0, 1, 2, 3, 4],
-            1: [5, 6, 7, 8, 9],
-            2: [10, 11, 12, 13, 14],
-            3: [15, 16, 17, 18, 19],
-            4: [20, 21, 22, 23, 24],
-            # Columns (5-9)
-            5: [0, 5, 10, 15, 20],
-            6: [1, 6, 11, 16, 21],
-            7: [2, 7, 12, 17, 22],
-            8: [3, 8, 13, 18, 23],
-            9: [4, 9, 14, 19, 24],
-            # Diagonals (12-13)
-            12: [0, 6, 12, 18, 24],
-            13: [4, 8, 12, 16, 20]
-        }
-        
-        # Pre-compute all possible lines and their sets for faster lookups
+ENGINES = ('set', 'bitboard', 'vectorized', 'incremental', 'indexed')
+TIERS = ('three_line', 'four_line', 'five_line')
+CONFIG_KEYS = ('line_scores', 'immediate_bonuses', 'new_scoring', 'move_weights', 'game_constraints')
+
+
+def _generate_line_definitions(size: int = 5) -> Dict[int, List[int]]:
+    """Rows, columns and both diagonals of a `size` x `size` board.
+
+    Rows are keys 0..size-1 and columns size..2*size-1; the diagonals keep
+    the keys 12 and 13 they have on the 5x5 board (2*size + 2 and + 3).
+    """
+    lines = {}
+    for row in range(size):
+        lines[row] = [row * size + col for col in range(size)]
+    for col in range(size):
+        lines[size + col] = [row * size + col for row in range(size)]
+    lines[2 * size + 2] = [i * size + i for i in range(size)]
+    lines[2 * size + 3] = [i * size + size - 1 - i for i in range(size)]
+    return lines
+
+
+LINE_DEFINITIONS = _generate_line_definitions(5)
+
+# Known optimal patterns
+KNOWN_PATTERNS = [
+    {
+        'cells': {0, 1, 2, 3, 4, 8, 12, 16, 17, 20},
+        'optimal_move': 18,
+        'description': "Row completion with diagonal potential",
+        'move_count': 10  # Number of cells already selected
+    }
+]
+
+
+def _to_mask(cells) -> int:
+    """Convert an iterable of cell indices to a board mask (bit i set for cell i)."""
+    mask = 0
+    for cell in cells:
+        mask |= 1 << cell
+    return mask
+
+
+def _generate_all_lines(line_definitions: Dict[int, List[int]]) -> List[List[int]]:
+    lines = []
+
+    # Generate all possible lines at once
+    for line in line_definitions.values():
+        # Add the full line
+        lines.append(line)
+
+        # Add 4-cell lines
+        for i in range(len(line)):
+            four_line = [x for j, x in enumerate(line) if j != i]
+            lines.append(four_line)
+
+        # Add 3-cell lines
+        for i in range(len(line) - 1):
+            for j in range(i + 1, len(line)):
+                three_line = [x for k, x in enumerate(line) if k != i and k != j]
+                lines.append(three_line)
+
+    return lines
+
+
+def _generate_transformations(size: int = 5) -> List[callable]:
+    """Generate all possible board transformations (rotations and flips) of a `size` x `size` board."""
+    last = size - 1
+    transformations = []
+
+    # Identity transformation
+    transformations.append(lambda x: x)
+
+    # Rotations (90, 180, 270 degrees)
+    transformations.append(lambda i: (i % size) * size + (last - i // size))  # 90 degrees clockwise
+    transformations.append(lambda i: size * size - 1 - i)  # 180 degrees
+    transformations.append(lambda i: (last - i % size) * size + i // size)  # 270 degrees clockwise
+
+    # Flips (horizontal and vertical)
+    transformations.append(lambda i: (i // size) * size + (last - i % size))  # Horizontal flip
+    transformations.append(lambda i: (last - i // size) * size + (i % size))  # Vertical flip
+
+    # Diagonal flips
+    transformations.append(lambda i: (i % size) * size + i // size)  # Main diagonal flip
+    transformations.append(lambda i: (last - i % size) * size + (last - i // size))  # Other diagonal flip
+
+    return transformations
+
+
+def _mask_luts(perm: Tuple[int, ...]) -> Tuple[Tuple[int, ...], ...]:
+    """Byte-indexed tables applying a cell permutation to a board mask.
+
+    Entry ``[j][b]`` is the image of the cells set in byte value ``b`` at
+    byte ``j`` of the mask, so a mask transforms with one lookup per byte.
+    """
+    luts = []
+    for shift in range(0, len(perm), 8):
+        lut = []
+        for byte in range(256):
+            image = 0
+            for bit in range(8):
+                if byte >> bit & 1 and shift + bit < len(perm):
+                    image |= 1 << perm[shift + bit]
+            lut.append(image)
+        luts.append(tuple(lut))
+    return tuple(luts)
+
+
+def _line_combinations(lines: List[List[int]], size: int, max_cells: int) -> List[List[List[int]]]:
+    """All `size`-line subsets whose union fits within `max_cells` cells.
+
+    Subsets are built depth-first in itertools.combinations order, and a
+    partial subset is only extended while its union still fits: adding
+    lines never shrinks the union, so no extension of an overflowing subset
+    can qualify. On large boards this skips most of the C(lines, size) space.
+    """
+    line_masks = [_to_mask(line) for line in lines]
+    result = []
+    chosen = []
+
+    def extend(start: int, union: int) -> None:
+        if len(chosen) == size:
+            result.append([lines[i] for i in chosen])
+            return
+        # Leave enough lines after `index` to complete the subset
+        for index in range(start, len(lines) - size + len(chosen) + 1):
+            extended = union | line_masks[index]
+            if extended.bit_count() <= max_cells:
+                chosen.append(index)
+                extend(index + 1, extended)
+                chosen.pop()
+
+    extend(0, 0)
+    return result
+
+
+def _incidence_matrix(cell_groups: List[List[int]], board_size: int) -> np.ndarray:
+    """(len(cell_groups) x board_size) 0/1 matrix with row i marking the cells of group i.
+
+    Stored as float32 so products go through BLAS; counts stay exact.
+    """
+    matrix = np.zeros((len(cell_groups), board_size), dtype=np.float32)
+    for row, cells in enumerate(cell_groups):
+        matrix[row, cells] = 1
+    return matrix
+
+
+def _membership_matrix(line_combinations: List[List[List[int]]], lines: List[List[int]]) -> np.ndarray:
+    """(num_combinations x num_lines) 0/1 matrix marking which lines make up each combination."""
+    matrix = np.zeros((len(line_combinations), len(lines)), dtype=np.float32)
+    for row, combination in enumerate(line_combinations):
+        for line in combination:
+            matrix[row, lines.index(line)] = 1
+    return matrix
+
+
+def _combination_masks(line_combinations: List[List[List[int]]]) -> List[Tuple[int, Tuple[int, ...]]]:
+    """Convert line combinations to (union mask, per-line masks) pairs."""
+    masks = []
+    for combination in line_combinations:
+        line_masks = tuple(_to_mask(line) for line in combination)
+        union = 0
+        for line_mask in line_masks:
+            union |= line_mask
+        masks.append((union, line_masks))
+    return masks
+
+
+class SolverTables:
+    """Board geometry and line-combination tables shared by every BingoSolver.
+
+    The tables depend only on GAME_CONSTRAINTS and LINE_SCORES, so they are
+    built once per process (per distinct config) by get_tables() rather than
+    by each solver instance. The board is square, `isqrt(board_size)` cells
+    a side; lines and symmetries are generated for that size.
+    """
+
+    def __init__(self, line_scores: Dict, game_constraints: Dict):
+        max_cells = game_constraints['max_cells']
+        board_size = game_constraints['board_size']
+        size = isqrt(board_size)
+        if size * size != board_size:
+            raise ValueError(f"board_size must be a square number of cells, got {board_size}")
+
+        self.board_size = board_size
+        self.size = size
+        self.line_size = size
+        self.line_definitions = LINE_DEFINITIONS if size == 5 else _generate_line_definitions(size)
         self.line_sets = {k: set(v) for k, v in self.line_definitions.items()}
-        self.all_lines = self._generate_all_lines()
-        
-        # Pre-compute line combinations
-        self._three_line_combinations = None
-        self._four_line_combinations = None
-        self._five_line_combinations = None
-        
-        # Pre-compute power values for scoring
-        self._power_values = {
-            i: LINE_SCORES['three_line']['power_base'] ** (LINE_SCORES['three_line']['power_exponent'] - i)
-            for i in range(GAME_CONSTRAINTS['max_cells'] + 1)
+        self.line_masks = [_to_mask(line) for line in self.line_definitions.values()]
+        self.all_lines = _generate_all_lines(self.line_definitions)
+
+        lines = list(self.line_definitions.values())
+        self.three_line_combinations = _line_combinations(lines, 3, max_cells)
+        self.four_line_combinations = _line_combinations(lines, 4, max_cells)
+        self.five_line_combinations = _line_combinations(lines, 5, max_cells)
+        self.three_line_masks = _combination_masks(self.three_line_combinations)
+        self.four_line_masks = _combination_masks(self.four_line_combinations)
+        self.five_line_masks = _combination_masks(self.five_line_combinations)
+
+        # Power values for scoring
+        self.power_values = {
+            i: line_scores['three_line']['power_base'] ** (line_scores['three_line']['power_exponent'] - i)
+            for i in range(max_cells + 1)
         }
 
-        # Pre-compute transformations for pattern matching
-        self._transformations = self._generate_transformations()
-        
-        # Known optimal patterns
-        self.patterns = [
-            {
-                'cells': {0, 1, 2, 3, 4, 8, 12, 16, 17, 20},
-                'optimal_move': 18,
-                'description': "Row completion with diagonal potential",
-                'move_count': 10  # Number of cells already selected
-            }
+        # Incidence matrices for the vectorized evaluator
+        self.line_incidence = _incidence_matrix(lines, board_size)
+        self.three_line_incidence = _incidence_matrix([sorted(set().union(*c)) for c in self.three_line_combinations], board_size)
+        self.four_line_incidence = _incidence_matrix([sorted(set().union(*c)) for c in self.four_line_combinations], board_size)
+        self.five_line_incidence = _incidence_matrix([sorted(set().union(*c)) for c in self.five_line_combinations], board_size)
+        self.three_line_membership = _membership_matrix(self.three_line_combinations, lines)
+        power_values = [self.power_values[i] for i in range(max_cells + 1)]
+        # Large boards raise the power exponent past what int64 holds
+        self.power_table = np.array(power_values, dtype=np.float64 if max(power_values) >= 2 ** 63 else None)
+
+        # Cell -> combination inverted index for the incremental evaluator
+        self.combination_masks = {
+            'three_line': self.three_line_masks,
+            'four_line': self.four_line_masks,
+            'five_line': self.five_line_masks
+        }
+        self.combination_cells = {
+            tier: [tuple(cell for cell in range(board_size) if union >> cell & 1) for union, _ in masks]
+            for tier, masks in self.combination_masks.items()
+        }
+        self.cell_combinations = {}
+        for tier, cells in self.combination_cells.items():
+            cell_combinations = [[] for _ in range(board_size)]
+            for index, combo_cells in enumerate(cells):
+                for cell in combo_cells:
+                    cell_combinations[cell].append(index)
+            self.cell_combinations[tier] = cell_combinations
+        self.line_sizes = [line_mask.bit_count() for line_mask in self.line_masks]
+        self.cell_lines = [
+            [line for line, line_mask in enumerate(self.line_masks) if line_mask >> cell & 1]
+            for cell in range(board_size)
+        ]
+        self.three_line_line_indices = [
+            tuple(self.line_masks.index(line_mask) for line_mask in line_masks)
+            for _, line_masks in self.three_line_masks
+        ]
+        self.line_three_combinations = [
+            [index for index, line_indices in enumerate(self.three_line_line_indices) if line in line_indices]
+            for line in range(len(self.line_masks))
         ]
 
-    def _generate_all_lines(self) -> List[List[int]]:
-        lines = []
-        
-        # Generate all possible lines at once
-        for line in self.line_definitions.values():
-            # Add the full line
-            lines.append(line)
-            
-            # Add 4-cell lines
-            for i in range(len(line)):
-                four_line = [x for j, x in enumerate(line) if j != i]
-                lines.append(four_line)
-            
-            # Add 3-cell lines
-            for i in range(len(line) - 1):
-                for j in range(i + 1, len(line)):
-                    three_line = [x for k, x in enumerate(line) if k != i and k != j]
-                    lines.append(three_line)
-
-        return lines
+        # Transformations for pattern matching, plus their cell permutations
+        self.transformations = _generate_transformations(size)
+        self.transformation_perms = [tuple(t(i) for i in range(board_size)) for t in self.transformations]
+        self.inverse_perms = []
+        for perm in self.transformation_perms:
+            inverse = [0] * board_size
+            for cell, image in enumerate(perm):
+                inverse[image] = cell
+            self.inverse_perms.append(tuple(inverse))
+        self.transformation_luts = [_mask_luts(perm) for perm in self.transformation_perms]
+        # The same tables with all 8 images packed side by side in one integer, `board_size`
+        # bits per transformation, so a board is transformed 8 ways with one lookup per byte
+        self.symmetry_luts = [
+            tuple(sum(luts[j][byte] << (board_size * index) for index, luts in enumerate(self.transformation_luts))
+                  for byte in range(256))
+            for j in range(len(self.transformation_luts[0]))
+        ]
+
+
+_TABLES: Dict[str, SolverTables] = {}
+
+
+def _freeze(value):
+    """Hashable snapshot of a (possibly nested) config dict."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+def get_tables(line_scores: Optional[Dict] = None, game_constraints: Optional[Dict] = None) -> SolverTables:
+    """Return the process-wide tables for the given (default: current) config."""
+    line_scores = LINE_SCORES if line_scores is None else line_scores
+    game_constraints = GAME_CONSTRAINTS if game_constraints is None else game_constraints
+    key = (_freeze(line_scores), _freeze(game_constraints))
+    tables = _TABLES.get(key)
+    if tables is None:
+        tables = _TABLES[key] = SolverTables(line_scores, game_constraints)
+    return tables
+
+
+def resolve_config(config: Optional[Dict] = None) -> Dict[str, Dict]:
+    """Full scoring config: scoring_config.py's dicts, each replaceable via `config`.
+
+    `config` maps any of CONFIG_KEYS (the lowercase scoring_config.py names)
+    to a replacement dict; missing keys use the module defaults.
+    """
+    resolved = {
+        'line_scores': LINE_SCORES,
+        'immediate_bonuses': IMMEDIATE_BONUSES,
+        'new_scoring': NEW_SCORING,
+        'move_weights': MOVE_WEIGHTS,
+        'game_constraints': GAME_CONSTRAINTS
+    }
+    if config:
+        unknown = set(config) - set(CONFIG_KEYS)
+        if unknown:
+            raise ValueError(f"Unknown config sections {sorted(unknown)}, expected some of {CONFIG_KEYS}")
+        resolved.update(config)
+    return resolved
+
+
+def config_key(config: Optional[Dict] = None) -> str:
+    """SHA-256 of the resolved scoring config's values, identifying the config a file was built for."""
+    config = resolve_config(config)
+    return hashlib.sha256(repr(tuple(_freeze(config[name]) for name in CONFIG_KEYS)).encode()).hexdigest()
+
+
+def build_tables() -> None:
+    """Eagerly build the solver tables, e.g. as a multiprocessing Pool initializer."""
+    get_tables()
+
+
+def transform_mask(board_mask: int, index: int, tables: Optional[SolverTables] = None) -> int:
+    """Image of a board mask under transformation `index`, via the byte lookup tables."""
+    tables = get_tables() if tables is None else tables
+    image = 0
+    shift = 0
+    for lut in tables.transformation_luts[index]:
+        image |= lut[board_mask >> shift & 0xFF]
+        shift += 8
+    return image
+
+
+def canonical_form(board_mask: int, tables: Optional[SolverTables] = None) -> Tuple[int, int]:
+    """Smallest mask among the 8 symmetric images of a board.
+
+    Returns (canonical mask, index of the transformation that produces it).
+    """
+    tables = get_tables() if tables is None else tables
+    images = 0
+    shift = 0
+    for lut in tables.symmetry_luts:
+        images |= lut[board_mask >> shift & 0xFF]
+        shift += 8
+    width = len(tables.transformation_perms[0])
+    field = (1 << width) - 1
+    best_mask, best_index = board_mask, 0
+    for index in range(1, len(tables.transformation_perms)):
+        image = images >> (width * index) & field
+        if image < best_mask:
+            best_mask, best_index = image, index
+    return best_mask, best_index
+
+
+class TranspositionTable:
+    """Bounded LRU cache of solver decisions keyed on canonical board masks.
+
+    Each entry holds the moves tied for the best total (in canonical
+    coordinates) with their score dicts, so a lookup can reproduce the
+    uncached tie-break exactly after mapping back through the inverse
+    transformation.
+    """
+
+    def __init__(self, maxsize: int = 100_000):
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: int) -> Optional[Tuple[Tuple[int, Dict[str, float]], ...]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: int, entry: Tuple[Tuple[int, Dict[str, float]], ...]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'size': len(self._entries)}
+
+
+_TRANSPOSITION_TABLES: Dict[tuple, TranspositionTable] = {}
+
+
+def get_transposition_table(config: Optional[Dict] = None) -> TranspositionTable:
+    """Return the process-wide decision cache for the given (default: current) scoring config."""
+    config = resolve_config(config)
+    key = tuple(_freeze(config[name]) for name in CONFIG_KEYS)
+    table = _TRANSPOSITION_TABLES.get(key)
+    if table is None:
+        table = _TRANSPOSITION_TABLES[key] = TranspositionTable()
+    return table
+
+
+class PatternLibrary:
+    """Known board patterns keyed on canonical board masks.
+
+    Each entry maps a canonical mask to (optimal move in canonical
+    coordinates, description), so a lookup is one canonicalization and one
+    dict access however many patterns the library holds. Boards whose cell
+    count matches no pattern are rejected before canonicalizing. Patterns
+    are boards of the geometry of `tables` (default: the configured board).
+    """
+
+    def __init__(self, entries: Optional[Dict[int, Tuple[int, str]]] = None,
+                 tables: Optional[SolverTables] = None):
+        self.tables = get_tables() if tables is None else tables
+        self.entries: Dict[int, Tuple[int, str]] = {}
+        self.sizes = set()
+        for mask, (move, description) in (entries or {}).items():
+            self.add(mask, move, description)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, board_mask: int, move: int, description: str) -> bool:
+        """Add a pattern given in any orientation; returns False if its canonical board is already known"""
+        tables = self.tables
+        canonical_mask, index = canonical_form(board_mask, tables)
+        if canonical_mask in self.entries:
+            return False
+        self.entries[canonical_mask] = (tables.transformation_perms[index][move], description)
+        self.sizes.add(canonical_mask.bit_count())
+        return True
+
+    @classmethod
+    def from_patterns(cls, patterns: List[Dict], tables: Optional[SolverTables] = None) -> 'PatternLibrary':
+        """Library of KNOWN_PATTERNS-style dicts; earlier patterns win"""
+        library = cls(tables=tables)
+        for pattern in patterns:
+            if len(pattern['cells']) == pattern.get('move_count', len(pattern['cells'])):
+                library.add(_to_mask(pattern['cells']), pattern['optimal_move'], pattern['description'])
+        return library
+
+    def lookup(self, board_mask: int) -> Optional[Dict]:
+        """{'move', 'description'} of the pattern matching the board in any orientation, or None"""
+        if board_mask.bit_count() not in self.sizes:
+            return None
+        tables = self.tables
+        canonical_mask, index = canonical_form(board_mask, tables)
+        entry = self.entries.get(canonical_mask)
+        if entry is None:
+            return None
+        move, description = entry
+        return {'move': tables.inverse_perms[index][move], 'description': description}
+
+
+_DEFAULT_PATTERN_LIBRARY: Optional[PatternLibrary] = None
+
+
+def get_pattern_library(tables: Optional[SolverTables] = None) -> PatternLibrary:
+    """Process-wide library of KNOWN_PATTERNS, used by solvers not given another one.
+
+    KNOWN_PATTERNS are 5x5 boards, so solvers on other board sizes get an
+    empty library.
+    """
+    global _DEFAULT_PATTERN_LIBRARY
+    tables = get_tables() if tables is None else tables
+    if tables.board_size != 25:
+        return PatternLibrary(tables=tables)
+    if _DEFAULT_PATTERN_LIBRARY is None:
+        _DEFAULT_PATTERN_LIBRARY = PatternLibrary.from_patterns(KNOWN_PATTERNS, tables)
+    return _DEFAULT_PATTERN_LIBRARY
+
+
+class _CoverageCounters:
+    """Coverage counters for one board, updated in place as cells are added.
+
+    Besides the per-combination missing-cell counts and per-line selected
+    counts, it keeps histograms of missing counts per tier, overall and per
+    cell, so a candidate move is scored in O(max_cells) rather than by
+    scanning every combination.
+    """
+
+    def __init__(self, tables: SolverTables, board_mask: int, config: Dict):
+        self.tables = tables
+        self.config = config
+        size = config['game_constraints']['max_cells'] + 2
+        board_size = config['game_constraints']['board_size']
+        free = ~board_mask
+
+        self.line_counts = [(line_mask & board_mask).bit_count() for line_mask in tables.line_masks]
+
+        self.missing = {}
+        self.hist = {}
+        self.cell_hist = {}
+        for tier in TIERS:
+            missing = [(union & free).bit_count() for union, _ in tables.combination_masks[tier]]
+            hist = [0] * size
+            cell_hist = [[0] * size for _ in range(board_size)]
+            for index, count in enumerate(missing):
+                hist[count] += 1
+                for cell in tables.combination_cells[tier][index]:
+                    cell_hist[cell][count] += 1
+            self.missing[tier] = missing
+            self.hist[tier] = hist
+            self.cell_hist[tier] = cell_hist
+
+        # Completed lines inside 3-line combinations, bucketed by missing count
+        three_missing = self.missing['three_line']
+        self.done = [
+            sum(1 for line in line_indices if self.line_counts[line] == tables.line_sizes[line])
+            for line_indices in tables.three_line_line_indices
+        ]
+        self.done_hist = [0] * size
+        self.cell_done_hist = [[0] * size for _ in range(board_size)]
+        self.line_hist = [[0] * size for _ in tables.line_masks]
+        for index, count in enumerate(three_missing):
+            done = self.done[index]
+            self.done_hist[count] += done
+            for cell in tables.combination_cells['three_line'][index]:
+                self.cell_done_hist[cell][count] += done
+            for line in tables.three_line_line_indices[index]:
+                self.line_hist[line][count] += 1
+
+    def add(self, cell: int) -> None:
+        """Account for `cell` becoming selected (it must have been free)."""
+        tables = self.tables
+        for tier in TIERS:
+            missing = self.missing[tier]
+            hist = self.hist[tier]
+            cell_hist = self.cell_hist[tier]
+            combination_cells = tables.combination_cells[tier]
+            is_three = tier == 'three_line'
+            for index in tables.cell_combinations[tier][cell]:
+                count = missing[index]
+                missing[index] = count - 1
+                hist[count] -= 1
+                hist[count - 1] += 1
+                done = self.done[index] if is_three else 0
+                for other in combination_cells[index]:
+                    bucket = cell_hist[other]
+                    bucket[count] -= 1
+                    bucket[count - 1] += 1
+                    if done:
+                        bucket = self.cell_done_hist[other]
+                        bucket[count] -= done
+                        bucket[count - 1] += done
+                if is_three:
+                    self.done_hist[count] -= done
+                    self.done_hist[count - 1] += done
+                    for line in tables.three_line_line_indices[index]:
+                        self.line_hist[line][count] -= 1
+                        self.line_hist[line][count - 1] += 1
+
+        three_missing = self.missing['three_line']
+        for line in tables.cell_lines[cell]:
+            self.line_counts[line] += 1
+            if self.line_counts[line] == tables.line_sizes[line]:
+                for index in tables.line_three_combinations[line]:
+                    count = three_missing[index]
+                    self.done[index] += 1
+                    self.done_hist[count] += 1
+                    for other in tables.combination_cells['three_line'][index]:
+                        self.cell_done_hist[other][count] += 1
+
+    def tier_score(self, tier: str, move: int, selected_cells: int) -> int:
+        """Sum of base + power terms over combinations still valid after playing `move`."""
+        base = self.config['line_scores'][tier]['base']
+        power_values = self.tables.power_values
+        budget = self.config['game_constraints']['max_cells'] - selected_cells
+        hist = self.hist[tier]
+        move_hist = self.cell_hist[tier][move]
+
+        score = 0
+        for count in range(budget + 1):
+            # Combinations without the move keep their count
+            others = hist[count] - move_hist[count]
+            if others:
+                score += others * (base + power_values[count + selected_cells])
+            # Combinations with the move lose one missing cell
+            if move_hist[count + 1]:
+                score += move_hist[count + 1] * (base + power_values[count + selected_cells])
+        return score
+
+    def completed_in_valid_three_lines(self, move: int, selected_cells: int) -> int:
+        """Completed lines summed over 3-line combinations still valid after playing `move`."""
+        tables = self.tables
+        budget = self.config['game_constraints']['max_cells'] - selected_cells
+        move_done = self.cell_done_hist[move]
+
+        total = 0
+        for count in range(budget + 1):
+            total += self.done_hist[count] - move_done[count] + move_done[count + 1]
+
+        # Lines the move itself completes
+        for line in tables.cell_lines[move]:
+            if self.line_counts[line] == tables.line_sizes[line] - 1:
+                line_hist = self.line_hist[line]
+                total += sum(line_hist[count + 1] for count in range(budget + 1))
+        return total
+
+
+class _Baseline:
+    """Per-board quantities shared by every candidate move of the indexed engine.
+
+    Holds each combination's missing-cell count and the score sums over
+    combinations that are valid when one more cell is selected; a move's
+    score is this baseline plus a delta over the combinations containing it.
+    """
+
+    def __init__(self, tables: SolverTables, board_mask: int, config: Dict):
+        self.selected_cells = board_mask.bit_count() + 1
+        self.budget = config['game_constraints']['max_cells'] - self.selected_cells
+        free = ~board_mask
+
+        self.line_counts = [(line_mask & board_mask).bit_count() for line_mask in tables.line_masks]
+        if self.selected_cells > config['new_scoring']['threshold']:
+            # Past the threshold only line counts are scored
+            return
+
+        # terms[tier][count]: score of a valid combination with `count` missing cells,
+        # 0 past the budget (counts never exceed max_cells)
+        size = config['game_constraints']['max_cells'] + 1
+        self.terms = {}
+        self.missing = {}
+        self.totals = {}
+        for tier in TIERS:
+            base = config['line_scores'][tier]['base']
+            terms = [
+                base + tables.power_values[count + self.selected_cells] if count <= self.budget else 0
+                for count in range(size)
+            ]
+            missing = [(union & free).bit_count() for union, _ in tables.combination_masks[tier]]
+            self.terms[tier] = terms
+            self.missing[tier] = missing
+            self.totals[tier] = sum(terms[count] for count in missing)
+
+        # Completed lines per 3-line combination, summed over the valid ones
+        self.done = [
+            sum(1 for line in line_indices if self.line_counts[line] == tables.line_sizes[line])
+            for line_indices in tables.three_line_line_indices
+        ]
+        self.done_total = sum(
+            done for done, count in zip(self.done, self.missing['three_line']) if count <= self.budget
+        )
+
+
+def _line_bonuses(touched: List[int], use_new_scoring: bool, config: Dict, line_size: int = 5) -> Tuple[int, int]:
+    """(three, four) line bonuses from the selected counts of the lines through a move.
+
+    The 4/3-cell bonuses are for lines one and two cells short of
+    `line_size`, which is what they are on the 5x5 board.
+    """
+    three_line_score = 0
+    four_line_score = 0
+    if use_new_scoring:
+        for selected_count in touched:
+            if selected_count == line_size:
+                three_line_score += config['new_scoring']['complete_line']
+            elif selected_count == line_size - 1:
+                four_line_score += config['new_scoring']['four_cell_line']
+            elif selected_count == line_size - 2:
+                three_line_score += config['new_scoring']['three_cell_line']
+        return three_line_score, four_line_score
+
+    # Add points for completed lines, else for new 4/3-cell lines
+    completed = sum(1 for count in touched if count == line_size)
+    if completed:
+        three_line_score += completed * config['immediate_bonuses']['complete_line']
+    else:
+        for selected_count in touched:
+            if selected_count == line_size - 1:
+                four_line_score += config['immediate_bonuses']['four_cell_line']
+            elif selected_count == line_size - 2:
+                three_line_score += config['immediate_bonuses']['three_cell_line']
+    return three_line_score, four_line_score
+
+
+def _mask_bits(board_masks, board_size: int) -> np.ndarray:
+    """(len(board_masks) x board_size) int64 0/1 matrix of the cells set in each mask.
+
+    Masks wider than int64 (boards past 7x7) are unpacked from their bytes.
+    """
+    if board_size < 63:
+        return (np.asarray(board_masks, dtype=np.int64)[:, None] >> np.arange(board_size)) & 1
+    num_bytes = (board_size + 7) // 8
+    packed = np.frombuffer(b''.join(int(mask).to_bytes(num_bytes, 'little') for mask in board_masks), dtype=np.uint8)
+    bits = np.unpackbits(packed.reshape(len(board_masks), num_bytes), axis=1, bitorder='little')
+    return bits[:, :board_size].astype(np.int64)
+
+
+def evaluate_all_moves_batch(board_masks: np.ndarray, tables: Optional[SolverTables] = None,
+                             config: Optional[Dict] = None) -> Dict[str, np.ndarray]:
+    """Score every cell of every board in `board_masks` as a candidate move.
+
+    Returns a (len(board_masks) x board_size) array per score component;
+    entry ``[b, m]`` equals ``BingoSolver(board b).evaluate_move(m)[component]``.
+    `board_masks` may be a list of Python ints on boards wider than int64.
+    """
+    config = resolve_config(config)
+    tables = get_tables(config['line_scores'], config['game_constraints']) if tables is None else tables
+    board_size = config['game_constraints']['board_size']
+    max_cells = config['game_constraints']['max_cells']
+    num_boards = len(board_masks)
+
+    # Column b * board_size + m of `candidates` is board b after playing m
+    boards = _mask_bits(board_masks, board_size)
+    candidates = boards[:, :, None] | np.eye(board_size, dtype=np.int64)[None, :, :]
+    candidates = candidates.transpose(1, 0, 2).reshape(board_size, num_boards * board_size)
+    unselected = (1 - candidates).astype(np.float32)
+    selected_cells = candidates.sum(axis=0)
+    use_new_scoring = selected_cells > config['new_scoring']['threshold']
+
+    padding = np.zeros(board_size + 1, dtype=tables.power_table.dtype)
+    selected_float = selected_cells.astype(np.float32)
+
+    def tier_score(incidence: np.ndarray, base: float) -> Tuple[np.ndarray, np.ndarray]:
+        # missing + selected indexes a lookup table that is zero past max_cells
+        index = (incidence @ unselected + selected_float).astype(np.intp)
+        lookup = np.concatenate([base + tables.power_table, padding])
+        return lookup[index].sum(axis=0), index <= max_cells
+
+    line_missing = (tables.line_incidence @ unselected).astype(np.int64)
+    line_complete = line_missing == 0
+    line_sizes = tables.line_incidence.sum(axis=1).astype(np.int64)
+    contains_move = np.tile(tables.line_incidence.astype(bool), num_boards)
+    line_counts = np.where(contains_move, line_sizes[:, None] - line_missing, 0)
+
+    if use_new_scoring.all():
+        # Past the threshold only line counts are scored
+        three_line_score = four_line_score = five_line_score = np.zeros(num_boards * board_size, dtype=np.int64)
+    else:
+        three_line_score, three_valid = tier_score(tables.three_line_incidence, config['line_scores']['three_line']['base'])
+        four_line_score, _ = tier_score(tables.four_line_incidence, config['line_scores']['four_line']['base'])
+        five_line_score, _ = tier_score(tables.five_line_incidence, config['line_scores']['five_line']['base'])
+
+        # Completed lines inside valid 3-line combinations
+        completed_in_combo = (tables.three_line_membership @ line_complete.astype(np.float32)).astype(np.int64)
+        three_line_score = three_line_score + (completed_in_combo * three_valid).sum(axis=0) * config['immediate_bonuses']['complete_line']
+
+    # Immediate bonuses for lines through the move
+    new_completed = (contains_move & line_complete).sum(axis=0)
+    three_line_score = three_line_score + new_completed * config['immediate_bonuses']['complete_line']
+    no_completion = new_completed == 0
+    # Lines one and two cells short of complete (4/3-cell lines on the 5x5 board)
+    line_full = line_counts == line_sizes[:, None]
+    line_four = line_counts == line_sizes[:, None] - 1
+    line_three = line_counts == line_sizes[:, None] - 2
+    four_line_score = four_line_score + no_completion * line_four.sum(axis=0) * config['immediate_bonuses']['four_cell_line']
+    three_line_score = three_line_score + no_completion * line_three.sum(axis=0) * config['immediate_bonuses']['three_cell_line']
+
+    # New scoring system after threshold
+    new_three = (line_full.sum(axis=0) * config['new_scoring']['complete_line']
+                 + line_three.sum(axis=0) * config['new_scoring']['three_cell_line'])
+    new_four = line_four.sum(axis=0) * config['new_scoring']['four_cell_line']
+    three_line_score = np.where(use_new_scoring, new_three, three_line_score)
+    four_line_score = np.where(use_new_scoring, new_four, four_line_score)
+    five_line_score = np.where(use_new_scoring, 0, five_line_score)
+
+    # Apply weights to scores
+    three_line_score = three_line_score * config['move_weights']['three_line']
+    four_line_score = four_line_score * config['move_weights']['four_line']
+    five_line_score = five_line_score * config['move_weights']['five_line']
+
+    scores = {
+        'three_line': three_line_score,
+        'four_line': four_line_score,
+        'five_line': five_line_score,
+        'total': three_line_score + four_line_score + five_line_score
+    }
+    return {key: values.reshape(num_boards, board_size) for key, values in scores.items()}
+
+
+class BingoSolver:
+    def __init__(self, board_state: Set[int], engine: str = 'set', use_cache: bool = False, opening_book=None,
+                 config: Optional[Dict] = None, pattern_library: Optional[PatternLibrary] = None):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {ENGINES}")
+        profile = profiling.ACTIVE
+        if profile is not None:
+            start = perf_counter_ns()
+        self.board_state = board_state
+        self.engine = engine
+        self.use_cache = use_cache
+        self.opening_book = opening_book  # Optional opening_book.OpeningBook consulted before searching
+
+        # Scoring parameters: scoring_config.py unless overridden (see resolve_config)
+        self.config = resolve_config(config)
+        self.line_scores = self.config['line_scores']
+        self.immediate_bonuses = self.config['immediate_bonuses']
+        self.new_scoring = self.config['new_scoring']
+        self.move_weights = self.config['move_weights']
+        self.game_constraints = self.config['game_constraints']
+
+        # Board-independent data is shared process-wide
+        tables = get_tables(self.line_scores, self.game_constraints)
+        self.line_definitions = tables.line_definitions
+        self.line_sets = tables.line_sets
+        self.line_masks = tables.line_masks
+        self.all_lines = tables.all_lines
+        self._tables = tables
+        self._power_values = tables.power_values
+        self._transformations = tables.transformations
+        # Patterns consulted by _check_patterns; the default is shared process-wide, so pass
+        # a PatternLibrary for other patterns (see pattern_library.py for loading and mining them)
+        self.pattern_library = get_pattern_library(tables) if pattern_library is None else pattern_library
+
+        # Bitboard representation: bit i is set when cell i is selected
+        self.board_mask = _to_mask(board_state)
+        self._counters = None
+        self._baseline = None
+        if profile is not None:
+            profile.record('solver_init', start)
+
+    @property
+    def counters(self) -> _CoverageCounters:
+        """Coverage counters used by the incremental engine, built on first use."""
+        if self._counters is None:
+            self._counters = _CoverageCounters(self._tables, self.board_mask, self.config)
+        return self._counters
+
+    def ensure_counters(self) -> None:
+        """Build the coverage counters now, so later add_cell calls update them in place."""
+        self.counters
+
+    def add_cell(self, cell: int) -> None:
+        """Select `cell` on this solver's board, updating incremental state."""
+        if self.board_mask >> cell & 1:
+            return
+        self.board_state.add(cell)
+        self.board_mask |= 1 << cell
+        self._baseline = None
+        if self._counters is not None:
+            self._counters.add(cell)
 
     @property
     def three_line_combinations(self) -> List[List[List[int]]]:
-        if self._three_line_combinations is None:
-            all_lines = list(self.line_definitions.values())
-            combinations = []
-            
-            # Pre-compute unique grids for each line
-            line_grids = [set(line) for line in all_lines]
-            
-            for i in range(len(all_lines)):
-                for j in range(i + 1, len(all_lines)):
-                    for k in range(j + 1, len(all_lines)):
-                        # Use set operations for faster union
-                        unique_grids = line_grids[i] | line_grids[j] | line_grids[k]
-                        if len(unique_grids) <= GAME_CONSTRAINTS['max_cells']:
-                            combinations.append([all_lines[i], all_lines[j], all_lines[k]])
-            
-            self._three_line_combinations = combinations
-        return self._three_line_combinations
+        return self._tables.three_line_combinations
 
     @property
     def four_line_combinations(self) -> List[List[List[int]]]:
-        if self._four_line_combinations is None:
-            all_lines = list(self.line_definitions.values())
-            combinations = []
-            
-            # Pre-compute unique grids for each line
-            line_grids = [set(line) for line in all_lines]
-            
-            for i in range(len(all_lines)):
-                for j in range(i + 1, len(all_lines)):
-                    for k in range(j + 1, len(all_lines)):
-                        for l in range(k + 1, len(all_lines)):
-                            # Use set operations for faster union
-                            unique_grids = line_grids[i] | line_grids[j] | line_grids[k] | line_grids[l]
-                            if len(unique_grids) <= GAME_CONSTRAINTS['max_cells']:
-                                combinations.append([all_lines[i], all_lines[j], all_lines[k], all_lines[l]])
-            
-            self._four_line_combinations = combinations
-        return self._four_line_combinations
+        return self._tables.four_line_combinations
 
     @property
     def five_line_combinations(self) -> List[List[List[int]]]:
-        if self._five_line_combinations is None:
-            all_lines = list(self.line_definitions.values())
-            combinations = []
-            
-            # Pre-compute unique grids for each line
-            line_grids = [set(line) for line in all_lines]
-            
-            for i in range(len(all_lines)):
-                for j in range(i + 1, len(all_lines)):
-                    for k in range(j + 1, len(all_lines)):
-                        for l in range(k + 1, len(all_lines)):
-                            for m in range(l + 1, len(all_lines)):
-                                # Use set operations for faster union
-                                unique_grids = line_grids[i] | line_grids[j] | line_grids[k] | line_grids[l] | line_grids[m]
-                                if len(unique_grids) <= GAME_CONSTRAINTS['max_cells']:
-                                    combinations.append([all_lines[i], all_lines[j], all_lines[k], all_lines[l], all_lines[m]])
-            
-            self._five_line_combinations = combinations
-        return self._five_line_combinations
+        return self._tables.five_line_combinations
+
+    @property
+    def three_line_masks(self) -> List[Tuple[int, Tuple[int, ...]]]:
+        return self._tables.three_line_masks
+
+    @property
+    def four_line_masks(self) -> List[Tuple[int, Tuple[int, ...]]]:
+        return self._tables.four_line_masks
+
+    @property
+    def five_line_masks(self) -> List[Tuple[int, Tuple[int, ...]]]:
+        return self._tables.five_line_masks
 
     def get_possible_moves(self) -> List[int]:
-        return [i for i in range(GAME_CONSTRAINTS['board_size']) if i not in self.board_state]
+        return [i for i in range(self.game_constraints['board_size']) if i not in self.board_state]
 
     def evaluate_move(self, move: int) -> Dict[str, float]:
+        profile = profiling.ACTIVE
+        if profile is not None:
+            start = perf_counter_ns()
+
+        if self.engine == 'vectorized':
+            score = {key: values[move].item() for key, values in self.evaluate_all_moves().items()}
+        else:
+            if self.engine == 'incremental' and not self.board_mask >> move & 1:
+                three_line_score, four_line_score, five_line_score = self._evaluate_move_incremental(move)
+            elif self.engine == 'indexed' and not self.board_mask >> move & 1:
+                three_line_score, four_line_score, five_line_score = self._evaluate_move_indexed(move)
+            elif self.engine != 'set':
+                three_line_score, four_line_score, five_line_score = self._evaluate_move_bitboard(move)
+            else:
+                three_line_score, four_line_score, five_line_score = self._evaluate_move_set(move)
+
+            # Apply weights to scores
+            three_line_score *= self.move_weights['three_line']
+            four_line_score *= self.move_weights['four_line']
+            five_line_score *= self.move_weights['five_line']
+
+            score = {
+                'three_line': three_line_score,
+                'four_line': four_line_score,
+                'five_line': five_line_score,
+                'total': three_line_score + four_line_score + five_line_score
+            }
+
+        if profile is not None:
+            selected_cells = (self.board_mask | 1 << move).bit_count()
+            profile.record('evaluate_move.new_scoring' if selected_cells > self.new_scoring['threshold']
+                           else 'evaluate_move.original', start)
+        return score
+
+    def _evaluate_move_set(self, move: int) -> Tuple[float, float, float]:
+        """Unweighted (three, four, five) line scores using set operations."""
+        profile = profiling.ACTIVE
         temp_state = self.board_state | {move}
         selected_cells = len(temp_state)
 
@@ -147,57 +918,69 @@ class BingoSolver:
         five_line_score = 0
 
         # Check if we're past the threshold for the new scoring logic
-        use_new_scoring = selected_cells > NEW_SCORING['threshold']
+        use_new_scoring = selected_cells > self.new_scoring['threshold']
 
         if use_new_scoring:
             # New scoring system after threshold - optimized with sets
             for line_set in self.line_sets.values():
                 if move in line_set:
                     selected_count = len(line_set & temp_state)
-                    if selected_count == 5:
-                        three_line_score += NEW_SCORING['complete_line']
-                    elif selected_count == 4:
-                        four_line_score += NEW_SCORING['four_cell_line']
-                    elif selected_count == 3:
-                        three_line_score += NEW_SCORING['three_cell_line']
+                    if selected_count == len(line_set):
+                        three_line_score += self.new_scoring['complete_line']
+                    elif selected_count == len(line_set) - 1:
+                        four_line_score += self.new_scoring['four_cell_line']
+                    elif selected_count == len(line_set) - 2:
+                        three_line_score += self.new_scoring['three_cell_line']
         else:
             # Original scoring system for first threshold cells
             # Check 3-line solutions
+            if profile is not None:
+                start = perf_counter_ns()
             for combination in self.three_line_combinations:
                 required_grids = set().union(*combination)
                 not_selected_grids = len(required_grids - temp_state)
                 
-                if not_selected_grids + selected_cells <= GAME_CONSTRAINTS['max_cells']:
-                    score = LINE_SCORES['three_line']['base'] + self._power_values[not_selected_grids + selected_cells]
+                if not_selected_grids + selected_cells <= self.game_constraints['max_cells']:
+                    score = self.line_scores['three_line']['base'] + self._power_values[not_selected_grids + selected_cells]
                     three_line_score += score
                     
                     for line in combination:
                         if all(grid in temp_state for grid in line):
-                            three_line_score += IMMEDIATE_BONUSES['complete_line']
+                            three_line_score += self.immediate_bonuses['complete_line']
+            if profile is not None:
+                profile.record('scan.three_line', start)
 
             # Check 4-line solutions
+            if profile is not None:
+                start = perf_counter_ns()
             for combination in self.four_line_combinations:
                 required_grids = set().union(*combination)
                 not_selected_grids = len(required_grids - temp_state)
                 
-                if not_selected_grids + selected_cells <= GAME_CONSTRAINTS['max_cells']:
-                    score = LINE_SCORES['four_line']['base'] + self._power_values[not_selected_grids + selected_cells]
+                if not_selected_grids + selected_cells <= self.game_constraints['max_cells']:
+                    score = self.line_scores['four_line']['base'] + self._power_values[not_selected_grids + selected_cells]
                     four_line_score += score
+            if profile is not None:
+                profile.record('scan.four_line', start)
 
             # Check 5-line solutions
+            if profile is not None:
+                start = perf_counter_ns()
             for combination in self.five_line_combinations:
                 required_grids = set().union(*combination)
                 not_selected_grids = len(required_grids - temp_state)
                 
-                if not_selected_grids + selected_cells <= GAME_CONSTRAINTS['max_cells']:
-                    score = LINE_SCORES['five_line']['base'] + self._power_values[not_selected_grids + selected_cells]
+                if not_selected_grids + selected_cells <= self.game_constraints['max_cells']:
+                    score = self.line_scores['five_line']['base'] + self._power_values[not_selected_grids + selected_cells]
                     five_line_score += score
+            if profile is not None:
+                profile.record('scan.five_line', start)
 
             # Add points for completed lines
             new_line_completed = False
             for line_set in self.line_sets.values():
                 if move in line_set and len(line_set & temp_state) == len(line_set):
-                    three_line_score += IMMEDIATE_BONUSES['complete_line']
+                    three_line_score += self.immediate_bonuses['complete_line']
                     new_line_completed = True
 
             # If no new line completed, check for new 4-cell lines
@@ -205,82 +988,176 @@ class BingoSolver:
                 for line_set in self.line_sets.values():
                     if move in line_set:
                         selected_count = len(line_set & temp_state)
-                        if selected_count == 4:
-                            four_line_score += IMMEDIATE_BONUSES['four_cell_line']
-                        elif selected_count == 3:
-                            three_line_score += IMMEDIATE_BONUSES['three_cell_line']
-
-        # Apply weights to scores
-        three_line_score *= MOVE_WEIGHTS['three_line']
-        four_line_score *= MOVE_WEIGHTS['four_line']
-        five_line_score *= MOVE_WEIGHTS['five_line']
-
-        return {
-            'three_line': three_line_score,
-            'four_line': four_line_score,
-            'five_line': five_line_score,
-            'total': three_line_score + four_line_score + five_line_score
+                        if selected_count == len(line_set) - 1:
+                            four_line_score += self.immediate_bonuses['four_cell_line']
+                        elif selected_count == len(line_set) - 2:
+                            three_line_score += self.immediate_bonuses['three_cell_line']
+
+        return three_line_score, four_line_score, five_line_score
+
+    def _evaluate_move_bitboard(self, move: int) -> Tuple[float, float, float]:
+        """Unweighted (three, four, five) line scores using board bitmasks.
+
+        Mirrors _evaluate_move_set term for term; coverage checks become
+        popcounts of ``mask & ~board``.
+        """
+        move_bit = 1 << move
+        board = self.board_mask | move_bit
+        selected_cells = board.bit_count()
+
+        three_line_score = 0
+        four_line_score = 0
+        five_line_score = 0
+
+        touched = [(line_mask & board).bit_count() for line_mask in self.line_masks if line_mask & move_bit]
+
+        if selected_cells > self.new_scoring['threshold']:
+            three_line_score, four_line_score = _line_bonuses(touched, True, self.config, self._tables.line_size)
+            return three_line_score, four_line_score, five_line_score
+
+        budget = self.game_constraints['max_cells'] - selected_cells
+        power_values = self._power_values
+        free = ~board
+        profile = profiling.ACTIVE
+
+        # Check 3-line solutions
+        if profile is not None:
+            start = perf_counter_ns()
+        base = self.line_scores['three_line']['base']
+        for union, line_masks in self.three_line_masks:
+            not_selected_grids = (union & free).bit_count()
+            if not_selected_grids <= budget:
+                three_line_score += base + power_values[not_selected_grids + selected_cells]
+                for line_mask in line_masks:
+                    if line_mask & free == 0:
+                        three_line_score += self.immediate_bonuses['complete_line']
+        if profile is not None:
+            profile.record('scan.three_line', start)
+            start = perf_counter_ns()
+
+        # Check 4-line solutions
+        base = self.line_scores['four_line']['base']
+        for union, _ in self.four_line_masks:
+            not_selected_grids = (union & free).bit_count()
+            if not_selected_grids <= budget:
+                four_line_score += base + power_values[not_selected_grids + selected_cells]
+        if profile is not None:
+            profile.record('scan.four_line', start)
+            start = perf_counter_ns()
+
+        # Check 5-line solutions
+        base = self.line_scores['five_line']['base']
+        for union, _ in self.five_line_masks:
+            not_selected_grids = (union & free).bit_count()
+            if not_selected_grids <= budget:
+                five_line_score += base + power_values[not_selected_grids + selected_cells]
+        if profile is not None:
+            profile.record('scan.five_line', start)
+
+        three_bonus, four_bonus = _line_bonuses(touched, False, self.config, self._tables.line_size)
+        return three_line_score + three_bonus, four_line_score + four_bonus, five_line_score
+
+    def _evaluate_move_incremental(self, move: int) -> Tuple[float, float, float]:
+        """Unweighted (three, four, five) line scores derived from the coverage counters."""
+        counters = self.counters
+        selected_cells = self.board_mask.bit_count() + 1
+        touched = [counters.line_counts[line] + 1 for line in self._tables.cell_lines[move]]
+
+        if selected_cells > self.new_scoring['threshold']:
+            three_line_score, four_line_score = _line_bonuses(touched, True, self.config, self._tables.line_size)
+            return three_line_score, four_line_score, 0
+
+        three_line_score = counters.tier_score('three_line', move, selected_cells)
+        three_line_score += counters.completed_in_valid_three_lines(move, selected_cells) * self.immediate_bonuses['complete_line']
+        four_line_score = counters.tier_score('four_line', move, selected_cells)
+        five_line_score = counters.tier_score('five_line', move, selected_cells)
+
+        three_bonus, four_bonus = _line_bonuses(touched, False, self.config, self._tables.line_size)
+        return three_line_score + three_bonus, four_line_score + four_bonus, five_line_score
+
+    def _evaluate_move_indexed(self, move: int) -> Tuple[float, float, float]:
+        """Unweighted (three, four, five) line scores as a delta against the board baseline.
+
+        Only combinations containing `move` change their missing count, so the
+        cell -> combination index limits the per-move work to those.
+        """
+        if self._baseline is None:
+            self._baseline = _Baseline(self._tables, self.board_mask, self.config)
+        baseline = self._baseline
+        tables = self._tables
+        budget = baseline.budget
+        touched = [baseline.line_counts[line] + 1 for line in tables.cell_lines[move]]
+
+        if baseline.selected_cells > self.new_scoring['threshold']:
+            three_line_score, four_line_score = _line_bonuses(touched, True, self.config, self._tables.line_size)
+            return three_line_score, four_line_score, 0
+
+        scores = {}
+        for tier in TIERS:
+            missing = baseline.missing[tier]
+            terms = baseline.terms[tier]
+            score = baseline.totals[tier]
+            for index in tables.cell_combinations[tier][move]:
+                count = missing[index]
+                score += terms[count - 1] - terms[count]
+            scores[tier] = score
+
+        # Completed lines inside valid 3-line combinations, including lines the move completes
+        completing = {
+            line for line in tables.cell_lines[move]
+            if baseline.line_counts[line] == tables.line_sizes[line] - 1
         }
+        completed = baseline.done_total
+        missing = baseline.missing['three_line']
+        for index in tables.cell_combinations['three_line'][move]:
+            count = missing[index]
+            if count <= budget:
+                completed -= baseline.done[index]
+            if count - 1 <= budget:
+                completed += baseline.done[index]
+                if completing:
+                    completed += sum(1 for line in tables.three_line_line_indices[index] if line in completing)
+
+        three_bonus, four_bonus = _line_bonuses(touched, False, self.config, self._tables.line_size)
+        three_line_score = scores['three_line'] + completed * self.immediate_bonuses['complete_line'] + three_bonus
+        return three_line_score, scores['four_line'] + four_bonus, scores['five_line']
+
+    def evaluate_all_moves(self) -> Dict[str, np.ndarray]:
+        """Score every cell as a candidate move in one pass.
+
+        Returns a board_size-element array per score component; entry ``m``
+        equals ``evaluate_move(m)[component]``.
+        """
+        scores = evaluate_all_moves_batch([self.board_mask], self._tables, self.config)
+        return {key: values[0] for key, values in scores.items()}
 
     def count_completed_lines(self) -> int:
+        if self.engine != 'set':
+            return sum(1 for line_mask in self.line_masks if line_mask & self.board_mask == line_mask)
         return sum(1 for line_set in self.line_sets.values() 
                   if all(cell in self.board_state for cell in line_set))
 
-    def _generate_transformations(self) -> List[callable]:
-        """Generate all possible board transformations (rotations and flips)."""
-        transformations = []
-        
-        # Identity transformation
-        transformations.append(lambda x: x)
-        
-        # Rotations (90, 180, 270 degrees)
-        transformations.append(lambda i: (i % 5) * 5 + (4 - i // 5))  # 90 degrees clockwise
-        transformations.append(lambda i: 24 - i)  # 180 degrees
-        transformations.append(lambda i: (4 - i % 5) * 5 + i // 5)  # 270 degrees clockwise
-        
-        # Flips (horizontal and vertical)
-        transformations.append(lambda i: (i // 5) * 5 + (4 - i % 5))  # Horizontal flip
-        transformations.append(lambda i: (4 - i // 5) * 5 + (i % 5))  # Vertical flip
-        
-        # Diagonal flips
-        transformations.append(lambda i: (i % 5) * 5 + i // 5)  # Main diagonal flip
-        transformations.append(lambda i: (4 - i % 5) * 5 + (4 - i // 5))  # Other diagonal flip
-        
-        return transformations
-
-    def _match_pattern(self, pattern: Dict) -> Optional[int]:
-        """Check if current board state matches a pattern after any transformation."""
-        # First check if the move count matches
-        if len(self.board_state) != pattern['move_count']:
-            return None
-
-        current_cells = sorted(list(self.board_state))
-        
-        # Try all transformations
-        for transform in self._transformations:
-            # Transform the pattern
-            transformed_pattern = sorted([transform(cell) for cell in pattern['cells']])
-            
-            # Check if transformed pattern matches current board state
-            if transformed_pattern == current_cells:
-                # If match found, transform the optimal move
-                return transform(pattern['optimal_move'])
-        
-        return None
-
     def _check_patterns(self) -> Optional[Dict]:
         """Check if current board state matches any known patterns."""
-        for pattern in self.patterns:
-            matched_move = self._match_pattern(pattern)
-            if matched_move is not None:
-                return {
-                    'move': matched_move,
-                    'description': pattern['description']
-                }
-        return None
+        profile = profiling.ACTIVE
+        if profile is not None:
+            start = perf_counter_ns()
+        match = self.pattern_library.lookup(self.board_mask)
+        if profile is not None:
+            profile.record('check_patterns', start)
+        return match
 
     def get_optimal_move(self) -> Tuple[int, Dict[str, float]]:
         """Get the optimal move for the current board state."""
+        profile = profiling.ACTIVE
+        if profile is None:
+            return self._get_optimal_move()
+        start = perf_counter_ns()
+        result = self._get_optimal_move()
+        profile.record('get_optimal_move', start)
+        return result
+
+    def _get_optimal_move(self) -> Tuple[int, Dict[str, float]]:
         # First check for known patterns
         pattern_match = self._check_patterns()
         if pattern_match:
@@ -289,17 +1166,50 @@ class BingoSolver:
             score = self.evaluate_move(move)
             return move, score
 
+        # Then the opening book, if one is attached and was built for this solver's config
+        if self.opening_book is not None and self.opening_book.config_key == config_key(self.config):
+            book_move = self.opening_book.lookup(self.board_mask)
+            if book_move is not None:
+                return book_move
+
         # Fall back to regular evaluation if no pattern matches
+        if self.use_cache:
+            return self._cached_optimal_move()
+        best_moves = self._best_moves()
+        if not best_moves:
+            return -1, None
+        return best_moves[0]
+
+    def _best_moves(self) -> List[Tuple[int, Dict[str, float]]]:
+        """All possible moves tied for the highest total, in cell order."""
         possible_moves = self.get_possible_moves()
-        best_move = -1
-        best_score = None
-        best_score_total = float('-inf')
-        
-        for move in possible_moves:
-            score = self.evaluate_move(move)
-            if score['total'] > best_score_total:
-                best_score_total = score['total']
-                best_score = score
-                best_move = move
-                
-        return best_move, best_score 
\ No newline at end of file
+        if not possible_moves:
+            return []
+
+        if self.engine == 'vectorized':
+            scores = self.evaluate_all_moves()
+            totals = scores['total'][possible_moves]
+            best_total = totals.max()
+            return [
+                (move, {key: values[move].item() for key, values in scores.items()})
+                for move, total in zip(possible_moves, totals) if total == best_total
+            ]
+
+        evaluated = [(move, self.evaluate_move(move)) for move in possible_moves]
+        best_total = max(score['total'] for _, score in evaluated)
+        return [(move, score) for move, score in evaluated if score['total'] == best_total]
+
+    def _cached_optimal_move(self) -> Tuple[int, Dict[str, float]]:
+        """get_optimal_move backed by the symmetry-canonical transposition table."""
+        canonical_mask, index = canonical_form(self.board_mask, self._tables)
+        table = get_transposition_table(self.config)
+        entry = table.get(canonical_mask)
+        if entry is None:
+            perm = self._tables.transformation_perms[index]
+            entry = tuple((perm[move], score) for move, score in self._best_moves())
+            table.put(canonical_mask, entry)
+        if not entry:
+            return -1, None
+
+        inverse = self._tables.inverse_perms[index]
+        return min(((inverse[move], score) for move, score in entry), key=lambda item: item[0])
@@ -1,5 +1,11 @@
 import { LINE_SCORES, IMMEDIATE_BONUSES, NEW_SCORING, MOVE_WEIGHTS, GAME_CONSTRAINTS } from './scoring_config.js';
 
+function popcount(mask) {
+    mask -= (mask >>> 1) & 0x55555555;
+    mask = (mask & 0x33333333) + ((mask >>> 2) & 0x33333333);
+    return (((mask + (mask >>> 4)) & 0x0f0f0f0f) * 0x01010101) >>> 24;
+}
+
 export class BingoSolver {
     constructor(boardState) {
         this.boardState = boardState;
@@ -138,15 +144,44 @@ export class BingoSolver {
         return this._fiveLineCombinations;
     }
 
+    _combinationMasks(key, combinations) {
+        // 25-bit mask of the cells of each combination, computed once per solver
+        if (!this._masks) this._masks = {};
+        if (!this._masks[key]) {
+            this._masks[key] = combinations.map(combination =>
+                combination.flat().reduce((mask, grid) => mask | (1 << grid), 0));
+        }
+        return this._masks[key];
+    }
+
+    _lineMask(line) {
+        // Cached per line definition array, which the combinations share
+        if (!this._lineMasks) this._lineMasks = new Map();
+        let mask = this._lineMasks.get(line);
+        if (mask === undefined) {
+            mask = line.reduce((lineMask, grid) => lineMask | (1 << grid), 0);
+            this._lineMasks.set(line, mask);
+        }
+        return mask;
+    }
+
+    _stateMask(state) {
+        let mask = 0;
+        for (const grid of state) mask |= 1 << grid;
+        return mask;
+    }
+
     getPossibleMoves() {
         return Array.from({length: GAME_CONSTRAINTS.board_size}, (_, i) => i)
             .filter(i => !this.boardState.has(i));
     }
 
-    evaluateMove(move) {
+    evaluateMove(move, includeDetails = true) {
+        // includeDetails = false skips recording the per-combination breakdown
         const tempState = new Set(this.boardState);
         tempState.add(move);
         const selectedCells = tempState.size;
+        const stateMask = this._stateMask(tempState);
 
         let scoreDetails = {
             threeLine: {
@@ -205,9 +240,11 @@ export class BingoSolver {
         } else {
             // Original scoring system for first threshold cells
             // Check 3-line solutions
-            for (const combination of this.threeLineCombinations) {
-                const requiredGrids = new Set(combination.flat());
-                const notSelectedGrids = [...requiredGrids].filter(grid => !tempState.has(grid)).length;
+            const threeLineMasks = this._combinationMasks('threeLine', this.threeLineCombinations);
+            const threeLineCombinations = this.threeLineCombinations;
+            for (let index = 0; index < threeLineCombinations.length; index++) {
+                const combination = threeLineCombinations[index];
+                const notSelectedGrids = popcount(threeLineMasks[index] & ~stateMask);
                 
                 if (notSelectedGrids + selectedCells <= GAME_CONSTRAINTS.max_cells) {
                     const powerScore = this._powerValues.get(notSelectedGrids + selectedCells);
@@ -223,51 +260,61 @@ export class BingoSolver {
                     };
                     
                     for (const line of combination) {
-                        if (line.every(grid => tempState.has(grid))) {
+                        if ((this._lineMask(line) & ~stateMask) === 0) {
                             scoreDetails.threeLine.immediate += IMMEDIATE_BONUSES.complete_line;
                             combinationDetails.immediateBonus += IMMEDIATE_BONUSES.complete_line;
                         }
                     }
                     
-                    scoreDetails.threeLine.combinations.push(combinationDetails);
+                    if (includeDetails) {
+                        scoreDetails.threeLine.combinations.push(combinationDetails);
+                    }
                 }
             }
             
             // Check 4-line solutions
-            for (const combination of this.fourLineCombinations) {
-                const requiredGrids = new Set(combination.flat());
-                const notSelectedGrids = [...requiredGrids].filter(grid => !tempState.has(grid)).length;
+            const fourLineMasks = this._combinationMasks('fourLine', this.fourLineCombinations);
+            const fourLineCombinations = this.fourLineCombinations;
+            for (let index = 0; index < fourLineCombinations.length; index++) {
+                const combination = fourLineCombinations[index];
+                const notSelectedGrids = popcount(fourLineMasks[index] & ~stateMask);
                 
                 if (notSelectedGrids + selectedCells <= GAME_CONSTRAINTS.max_cells) {
                     const powerScore = this._powerValues.get(notSelectedGrids + selectedCells);
                     scoreDetails.fourLine.base += LINE_SCORES.four_line.base;
                     scoreDetails.fourLine.power += powerScore;
                     
-                    scoreDetails.fourLine.combinations.push({
-                        lines: combination,
-                        remainingMoves: notSelectedGrids,
-                        powerScore: powerScore,
-                        baseScore: LINE_SCORES.four_line.base
-                    });
+                    if (includeDetails) {
+                        scoreDetails.fourLine.combinations.push({
+                            lines: combination,
+                            remainingMoves: notSelectedGrids,
+                            powerScore: powerScore,
+                            baseScore: LINE_SCORES.four_line.base
+                        });
+                    }
                 }
             }
             
             // Check 5-line solutions
-            for (const combination of this.fiveLineCombinations) {
-                const requiredGrids = new Set(combination.flat());
-                const notSelectedGrids = [...requiredGrids].filter(grid => !tempState.has(grid)).length;
+            const fiveLineMasks = this._combinationMasks('fiveLine', this.fiveLineCombinations);
+            const fiveLineCombinations = this.fiveLineCombinations;
+            for (let index = 0; index < fiveLineCombinations.length; index++) {
+                const combination = fiveLineCombinations[index];
+                const notSelectedGrids = popcount(fiveLineMasks[index] & ~stateMask);
                 
                 if (notSelectedGrids + selectedCells <= GAME_CONSTRAINTS.max_cells) {
                     const powerScore = this._powerValues.get(notSelectedGrids + selectedCells);
                     scoreDetails.fiveLine.base += LINE_SCORES.five_line.base;
                     scoreDetails.fiveLine.power += powerScore;
                     
-                    scoreDetails.fiveLine.combinations.push({
-                        lines: combination,
-                        remainingMoves: notSelectedGrids,
-                        powerScore: powerScore,
-                        baseScore: LINE_SCORES.five_line.base
-                    });
+                    if (includeDetails) {
+                        scoreDetails.fiveLine.combinations.push({
+                            lines: combination,
+                            remainingMoves: notSelectedGrids,
+                            powerScore: powerScore,
+                            baseScore: LINE_SCORES.five_line.base
+                        });
+                    }
                 }
             }
         }
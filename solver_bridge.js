@@ -1,40 +1,77 @@
+import { createInterface } from 'readline';
 import { BingoSolver } from './solver.js';
 
-function evaluateBoard() {
-    // Get board state from command line argument
-    const boardArg = process.argv[2];
-    if (!boardArg) {
-        console.error('Board state argument is required');
-        process.exit(1);
-    }
-
-    // Parse board state into a Set
-    const boardState = new Set(
+function parseBoard(boardArg) {
+    // "empty" or comma-separated cell indices
+    return new Set(
         boardArg === 'empty' ? [] : boardArg.split(',').map(Number)
     );
+}
 
-    // Create solver and evaluate moves
-    const solver = new BingoSolver(boardState);
+function evaluate(solver, includeDetails) {
     const evaluations = {};
-    
+
     // Get possible moves and evaluate each one
     const possibleMoves = solver.getPossibleMoves();
     for (const move of possibleMoves) {
-        const evaluation = solver.evaluateMove(move);
+        const evaluation = solver.evaluateMove(move, includeDetails);
+        if (!includeDetails) {
+            delete evaluation.details;
+        }
         evaluations[move] = evaluation;
     }
 
     // Check for pattern match
-    const optimalMove = solver.getOptimalMove();
-    if (optimalMove.pattern) {
-        evaluations[optimalMove.move] = {
-            ...optimalMove.score,
-            pattern: optimalMove.pattern
+    const patternMatch = solver._checkPatterns();
+    if (patternMatch) {
+        evaluations[patternMatch.move] = {
+            ...evaluations[patternMatch.move],
+            pattern: patternMatch.description
         };
     }
-    
+
+    return evaluations;
+}
+
+function evaluateBoard() {
+    // Get board state from command line argument
+    const boardArg = process.argv[2];
+    if (!boardArg) {
+        console.error('Board state argument is required');
+        process.exit(1);
+    }
+
+    // Create solver and evaluate moves
+    const solver = new BingoSolver(parseBoard(boardArg));
+
     // Output results as JSON
-    console.log(JSON.stringify(evaluations));
+    console.log(JSON.stringify(evaluate(solver, true)));
 }
 
-evaluateBoard(); 
\ No newline at end of file
+function serve() {
+    // One board per input line, one JSON evaluation (without score details) per output line,
+    // in order. The solver, and its cached line combinations, is reused across requests.
+    const solver = new BingoSolver(new Set());
+    const lines = createInterface({ input: process.stdin, crlfDelay: Infinity });
+    let output = [];
+
+    // Write all responses for a chunk of pipelined requests at once
+    const flush = () => {
+        process.stdout.write(output.join('\n') + '\n');
+        output = [];
+    };
+
+    lines.on('line', line => {
+        const boardArg = line.trim();
+        if (!boardArg) return;
+        solver.boardState = parseBoard(boardArg);
+        if (!output.length) setImmediate(flush);
+        output.push(JSON.stringify(evaluate(solver, false)));
+    });
+}
+
+if (process.argv[2] === '--serve') {
+    serve();
+} else {
+    evaluateBoard();
+}
@@ -1,15 +1,26 @@
+import argparse
 import subprocess
 import json
 import sys
-from typing import Set, List, Dict, Tuple
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Set, List, Dict, Tuple, Iterable, Optional
 import random
 
 # Add evaluation directory to Python path
 sys.path.append('evaluation')
 
+BOARD_SIZE = 25
+MAX_CELLS = 16
+
+def format_board_arg(board_state: Set[int]) -> str:
+    """Encode a board state the way solver_bridge.js expects it"""
+    return ','.join(map(str, sorted(board_state))) if board_state else "empty"
+
 def evaluate_board_js(board_state: Set[int]) -> Dict[int, Dict[str, float]]:
     """Use the JavaScript solver to evaluate the board state"""
-    board_str = ','.join(map(str, sorted(board_state))) if board_state else "empty"
+    board_str = format_board_arg(board_state)
     try:
         result = subprocess.run(['node', 'solver_bridge.js', board_str], 
                               capture_output=True, text=True, check=True)
@@ -19,14 +30,68 @@ def evaluate_board_js(board_state: Set[int]) -> Dict[int, Dict[str, float]]:
         print(f"stderr: {e.stderr}")
         raise
 
-def get_optimal_move_js(board_state: Set[int]) -> Tuple[int, Dict[str, float]]:
-    """Get the optimal move using the JavaScript solver"""
-    evaluations = evaluate_board_js(board_state)
+class JSSolverBridge:
+    """Long-lived `node solver_bridge.js --serve` process.
+
+    Board states are written one per line and evaluations read back one JSON
+    object per line, in order, so Node startup and module loading are paid once
+    instead of once per board. Use as a context manager.
+    """
+
+    def __init__(self, script: str = 'solver_bridge.js'):
+        self.process = subprocess.Popen(['node', script, '--serve'],
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        text=True, bufsize=1 << 16)
+
+    def __enter__(self) -> 'JSSolverBridge':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self.process.poll() is None:
+            self.process.stdin.close()
+            self.process.wait()
+
+    def evaluate_many(self, board_states: Iterable[Set[int]]) -> List[Dict[str, Dict[str, float]]]:
+        """Evaluate many boards, pipelining all requests through the bridge"""
+        board_args = [format_board_arg(board_state) for board_state in board_states]
+
+        # Write from a separate thread so neither side blocks on a full pipe
+        def write_requests():
+            for board_arg in board_args:
+                self.process.stdin.write(board_arg + '\n')
+            self.process.stdin.flush()
+
+        writer = threading.Thread(target=write_requests, daemon=True)
+        writer.start()
+        evaluations = []
+        for _ in board_args:
+            line = self.process.stdout.readline()
+            if not line:
+                raise RuntimeError(f"JS solver bridge exited with code {self.process.poll()}")
+            evaluations.append(json.loads(line))
+        writer.join()
+        return evaluations
+
+    def evaluate(self, board_state: Set[int]) -> Dict[str, Dict[str, float]]:
+        return self.evaluate_many([board_state])[0]
+
+def best_move_from_evaluations(evaluations: Dict[str, Dict]) -> Tuple[int, Dict[str, float]]:
+    """Pick the move the JS solver would play: a pattern match, else the first highest total"""
     if not evaluations:
         return -1, {"total": 0, "threeLine": 0, "fourLine": 0, "fiveLine": 0}
+    for move, evaluation in evaluations.items():
+        if "pattern" in evaluation:
+            return int(move), evaluation
     best_move = max(evaluations.items(), key=lambda x: float(x[1]["total"]))
     return int(best_move[0]), best_move[1]
 
+def get_optimal_move_js(board_state: Set[int]) -> Tuple[int, Dict[str, float]]:
+    """Get the optimal move using the JavaScript solver"""
+    return best_move_from_evaluations(evaluate_board_js(board_state))
+
 def format_py_score(score: Dict) -> Dict[str, float]:
     """Format Python solver score to match JavaScript format"""
     return {
@@ -36,10 +101,10 @@ def format_py_score(score: Dict) -> Dict[str, float]:
         "fiveLine": float(score["five_line"])
     }
 
-def get_optimal_move_py(board_state: Set[int]) -> Tuple[int, Dict[str, float]]:
+def get_optimal_move_py(board_state: Set[int], engine: str = 'set') -> Tuple[int, Dict[str, float]]:
     """Get the optimal move using the Python solver"""
     from solver import BingoSolver
-    solver = BingoSolver(board_state)
+    solver = BingoSolver(board_state, engine=engine)
     move, score = solver.get_optimal_move()
     if move == -1:
         return move, {"total": 0, "threeLine": 0, "fourLine": 0, "fiveLine": 0}
@@ -75,6 +140,39 @@ def generate_test_cases() -> List[Set[int]]:
     
     return test_cases
 
+def generate_random_states(count: int, max_cells: int = MAX_CELLS - 1, seed: int = 0) -> List[Set[int]]:
+    """Random board states with 0 to `max_cells` selected cells"""
+    rng = random.Random(seed)
+    return [set(rng.sample(range(BOARD_SIZE), rng.randint(0, max_cells))) for _ in range(count)]
+
+def generate_exhaustive_states(max_cells: int) -> List[Set[int]]:
+    """Every canonical (symmetry-reduced) board state with up to `max_cells` cells"""
+    from opening_book import enumerate_canonical_states
+    return [{cell for cell in range(BOARD_SIZE) if mask >> cell & 1}
+            for level in enumerate_canonical_states(max_cells) for mask in sorted(level)]
+
+def compare_moves_batch(board_states: List[Set[int]], bridge: JSSolverBridge,
+                        engine: str = 'vectorized') -> List[Dict]:
+    """compare_moves for many boards, with the JS side pipelined through one bridge"""
+    # Node evaluates its side in its own process while this one runs the Python solver
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        js_evaluations = executor.submit(bridge.evaluate_many, board_states)
+        py_moves = [get_optimal_move_py(board_state, engine) for board_state in board_states]
+        js_evaluations = js_evaluations.result()
+
+    results = []
+    for board_state, evaluations, (py_move, py_score) in zip(board_states, js_evaluations, py_moves):
+        js_move, js_score = best_move_from_evaluations(evaluations)
+        results.append({
+            "board_state": sorted(board_state),
+            "js_move": js_move,
+            "js_score": js_score,
+            "py_move": py_move,
+            "py_score": py_score,
+            "match": js_move == py_move
+        })
+    return results
+
 def compare_moves(board_state: Set[int]) -> Dict:
     """Compare moves suggested by both solvers for a given board state"""
     try:
@@ -126,5 +224,73 @@ def run_comparison_tests():
     print(f"Different moves: {total - matches}")
     print(f"Match rate: {(matches/total)*100:.1f}%")
 
+def run_bulk_comparison(board_states: List[Set[int]], engine: str = 'vectorized',
+                        max_reported: int = 10) -> int:
+    """Compare both solvers on many boards through the persistent bridge; returns the mismatch count"""
+    print(f"\nComparing {len(board_states)} board states through the persistent JS bridge...")
+    start = time.perf_counter()
+    with JSSolverBridge() as bridge:
+        results = compare_moves_batch(board_states, bridge, engine)
+    elapsed = time.perf_counter() - start
+
+    mismatches = [result for result in results if not result["match"]]
+    for result in mismatches[:max_reported]:
+        print(f"Board state: {result['board_state']}")
+        print(f"JS Solver  -> Move: {result['js_move']}, Score: {result['js_score']}")
+        print(f"PY Solver  -> Move: {result['py_move']}, Score: {result['py_score']}")
+        print("-" * 60)
+
+    total = len(results)
+    print("\nSummary:")
+    print(f"Total test cases: {total}")
+    print(f"Matching moves: {total - len(mismatches)}")
+    print(f"Different moves: {len(mismatches)}")
+    if total:
+        print(f"Match rate: {((total - len(mismatches)) / total) * 100:.1f}%")
+    print(f"Elapsed: {elapsed:.1f}s ({total / elapsed:.0f} states/s)")
+    return len(mismatches)
+
+def run_engine_parity(exhaustive_cells: int = 2, random_states: int = 100, num_workers: int = 4) -> int:
+    """Diff every Python engine (and the cached path) against the reference engine on a small
+    in-memory golden corpus (see evaluation/parity.py); returns the number of failing engines"""
+    from parity import CACHED, REFERENCE_ENGINE, GoldenScores, diff_engine, generate_corpus, print_report
+    from solver import ENGINES
+
+    print("\nChecking Python engine score parity...")
+    golden = GoldenScores.build(generate_corpus(exhaustive_cells, random_states), num_workers)
+    failed = 0
+    for engine in (*ENGINES, CACHED):
+        if engine == REFERENCE_ENGINE:
+            continue
+        report = diff_engine(golden, engine, num_workers)
+        print_report(golden, report)
+        failed += bool(report['score_mismatches'] or report['move_mismatches'])
+    return failed
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare the Python and JavaScript solvers")
+    parser.add_argument('--random', type=int, default=0, metavar='N',
+                        help="Also compare N random board states")
+    parser.add_argument('--exhaustive', type=int, default=None, metavar='CELLS',
+                        help="Also compare every canonical board state with up to CELLS cells")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for --random")
+    parser.add_argument('--engine', default='vectorized', help="Python solver engine for bulk comparisons")
+    parser.add_argument('--skip-engine-parity', action='store_true',
+                        help="Skip checking the Python engines against the reference engine")
+    args = parser.parse_args(argv)
+
+    if not args.random and args.exhaustive is None:
+        run_comparison_tests()
+        if not args.skip_engine_parity and run_engine_parity():
+            return 1
+        return 0
+
+    board_states = []
+    if args.exhaustive is not None:
+        board_states.extend(generate_exhaustive_states(args.exhaustive))
+    if args.random:
+        board_states.extend(generate_random_states(args.random, seed=args.seed))
+    return 1 if run_bulk_comparison(board_states, args.engine) else 0
+
 if __name__ == "__main__":
-    run_comparison_tests() 
\ No newline at end of file
+    sys.exit(main()) 
\ No newline at end of file